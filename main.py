@@ -1,5 +1,5 @@
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 from pathlib import Path
 import sys
 
@@ -10,8 +10,7 @@ sys.path.append(str(project_root))
 from src.trading_system_runner import TradingSystemRunner
 
 # Set reference date with timezone
-ny_tz = pytz.timezone('America/New_York')
-reference_date = ny_tz.localize(datetime(2025, 2, 5))
+reference_date = datetime(2025, 2, 5, tzinfo=ZoneInfo('America/New_York'))
 
 # Create runner
 runner = TradingSystemRunner(
@@ -4,8 +4,57 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import json
+import orjson
 import logging
+import re
+
+from src.market_data_collection_system import partition_files
+
+try:
+    import bottleneck as bn
+except ImportError:  # optional: single-pass moving-window kernels
+    bn = None
+
+# Price/volume columns every ticker frame must provide
+REQUIRED_COLS = frozenset({'Open', 'High', 'Low', 'Close', 'Volume'})
+
+# Rolling window (in hourly bars) used for the Volatility feature
+VOLATILITY_WINDOW = 24
+
+def _returns_and_volatility(close: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bar-to-bar returns and their rolling standard deviation, computed from one Close array."""
+    returns = np.empty(len(close), dtype=np.float64)
+    returns[:1] = np.nan
+    np.divide(close[1:], close[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    
+    if bn is not None:
+        volatility = bn.move_std(returns, window, ddof=1)
+    else:
+        volatility = pd.Series(returns).rolling(window).std().to_numpy()
+    return returns, volatility
+
+# Trade timeframes such as "5d", "12h" or "2w"
+_TF_RE = re.compile(r'([0-9]+)([dhw])')
+_TF_UNITS = {'h': 'hours', 'd': 'days', 'w': 'weeks'}
+_TIMEFRAME_CACHE: Dict[str, timedelta] = {}
+
+def _parse_timeframe(expected_timeframe: str) -> timedelta:
+    """Parse a trade timeframe into a timedelta, caching each distinct string."""
+    duration = _TIMEFRAME_CACHE.get(expected_timeframe)
+    if duration is None:
+        match = _TF_RE.fullmatch(expected_timeframe)
+        if not match:
+            raise ValueError(f"Unsupported timeframe format: {expected_timeframe}")
+        duration = timedelta(**{_TF_UNITS[match.group(2)]: int(match.group(1))})
+        _TIMEFRAME_CACHE[expected_timeframe] = duration
+    return duration
+
+def _json_default(obj):
+    """orjson fallback for pandas Timestamps, which it does not serialize natively."""
+    if isinstance(obj, pd.Timestamp):
+        return obj.to_pydatetime()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 @dataclass
 class TradePosition:
@@ -19,6 +68,13 @@ class TradePosition:
 
 @dataclass
 class TradeResult:
+    # Backtests keep every result in memory; slots drop the per-instance __dict__
+    __slots__ = (
+        'entry_time', 'exit_time', 'entry_price', 'exit_price', 'position_size',
+        'direction', 'ticker', 'fees', 'pnl', 'pnl_pct', 'agent_name',
+        'reasoning', 'exit_reason'
+    )
+    
     entry_time: datetime
     exit_time: datetime
     entry_price: float
@@ -43,7 +99,6 @@ class BacktestFramework:
         self.fee_pct = transaction_fee_pct
         self.data_dir = Path(data_dir)
         self.trades: List[TradeResult] = []
-        self.current_positions: Dict[str, TradePosition] = {}
         self.reference_date = reference_date
         
         # Setup logging
@@ -66,37 +121,43 @@ class BacktestFramework:
         prepared_data = {}
         
         for ticker in tickers:
-            file_path = self.data_dir / f"{ticker}_hourly.csv"
-            if not file_path.exists():
+            files = partition_files(str(self.data_dir), ticker)
+            if not files:
                 self.logger.warning(f"Data file not found for {ticker}")
                 continue
                 
             try:
-                df = pd.read_csv(file_path)
-                df['Datetime'] = pd.to_datetime(df['Datetime'])
+                # Only read the column chunks we need
+                df = pd.read_parquet(
+                    files,
+                    engine='pyarrow',
+                    columns=['Datetime', *sorted(REQUIRED_COLS)]
+                )
                 
-                # Basic data validation
-                if df.isnull().any().any():
-                    self.logger.warning(f"Found null values in {ticker} data")
-                    df = df.fillna(method='ffill')
+                # Basic data cleaning (no-op when there are no gaps)
+                df.ffill(inplace=True)
                 
                 # Ensure required columns exist
-                required_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-                if not all(col in df.columns for col in required_cols):
+                if not REQUIRED_COLS.issubset(df.columns):
                     self.logger.error(f"Missing required columns in {ticker} data")
                     continue
                 
+                # Sort once so trades can locate bars by binary search
+                df = df.sort_values('Datetime')
+                df = df.set_index(pd.DatetimeIndex(df['Datetime']).rename(None))
+                
                 # Filter date range
-                mask = (df['Datetime'] >= start_date) & (df['Datetime'] <= end_date)
-                df = df[mask].copy()
+                df = df.loc[start_date:end_date]
                 
                 if len(df) == 0:
                     self.logger.warning(f"No data in specified range for {ticker}")
                     continue
                 
                 # Add derived features
-                df['Returns'] = df['Close'].pct_change()
-                df['Volatility'] = df['Returns'].rolling(24).std()
+                returns, volatility = _returns_and_volatility(
+                    df['Close'].to_numpy(dtype=np.float64), VOLATILITY_WINDOW
+                )
+                df = df.assign(Returns=returns, Volatility=volatility)
                 
                 prepared_data[ticker] = df
                 
@@ -118,32 +179,62 @@ class BacktestFramework:
             expected_profit_percentage: float  # New parameter
         ) -> Optional[TradeResult]:
             """
-            Execute a trade using historical market data.
+            Execute a trade using historical market data (sorted by Datetime).
             The trade will exit early if the expected_profit_percentage is reached before the expected_timeframe.
             """
+            return self._execute_on_arrays(
+                ticker=ticker,
+                action=action,
+                arrays=self._market_arrays(market_data),
+                position_size=position_size,
+                agent_name=agent_name,
+                reasoning=reasoning,
+                expected_timeframe=expected_timeframe,
+                expected_profit_percentage=expected_profit_percentage
+            )
+
+    @staticmethod
+    def _market_arrays(market_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Extract the columns used by trade simulation once, as NumPy-backed arrays."""
+        # Frames sliced from the runner's panel carry the timestamps on the index only
+        datetimes = market_data['Datetime'] if 'Datetime' in market_data.columns else market_data.index
+        if not pd.api.types.is_datetime64_any_dtype(datetimes):
+            datetimes = pd.to_datetime(datetimes)
+        return {
+            'Datetime': pd.DatetimeIndex(datetimes),
+            'High': market_data['High'].to_numpy(dtype=np.float64),
+            'Low': market_data['Low'].to_numpy(dtype=np.float64),
+            'Close': market_data['Close'].to_numpy(dtype=np.float64)
+        }
+
+    def _execute_on_arrays(
+            self,
+            ticker: str,
+            action: str,
+            arrays: Dict[str, np.ndarray],
+            position_size: float,
+            agent_name: str,
+            reasoning: str,
+            expected_timeframe: str,
+            expected_profit_percentage: float
+        ) -> Optional[TradeResult]:
+            """Simulate a trade against the arrays returned by _market_arrays."""
             if self.reference_date is None:
                 raise ValueError("reference_date must be set to execute trades")
                 
-            # Parse timeframe
-            if not expected_timeframe.endswith('d'):
-                raise ValueError(f"Unsupported timeframe format: {expected_timeframe}")
-            days = int(expected_timeframe[:-1])
-            
             # Calculate entry and max exit times
             entry_time = self.reference_date
-            max_exit_time = entry_time + timedelta(days=days)
+            max_exit_time = entry_time + _parse_timeframe(expected_timeframe)
             
-            # Convert Datetime column to datetime if it's not already
-            if 'Datetime' in market_data.columns and not pd.api.types.is_datetime64_any_dtype(market_data['Datetime']):
-                market_data['Datetime'] = pd.to_datetime(market_data['Datetime'])
-            
-            # Find entry price and time
-            entry_mask = (market_data['Datetime'] >= entry_time)
-            if not any(entry_mask):
+            # Locate entry and exit bars by binary search on the sorted Datetime column
+            datetimes = arrays['Datetime']
+            closes = arrays['Close']
+            entry_idx = datetimes.searchsorted(entry_time, side='left')
+            if entry_idx == len(datetimes):
                 raise ValueError(f"No data available at or after entry time {entry_time}")
                 
-            entry_price = market_data.loc[entry_mask].iloc[0]['Close']
-            actual_entry_time = market_data.loc[entry_mask].iloc[0]['Datetime']
+            entry_price = closes[entry_idx]
+            actual_entry_time = datetimes[entry_idx]
             
             # Calculate target price based on position direction
             if action == 'BUY':
@@ -152,40 +243,27 @@ class BacktestFramework:
                 target_price = entry_price * (1 - expected_profit_percentage)
             
             # Look for profit target hit or reach max time
-            trade_data = market_data[
-                (market_data['Datetime'] >= actual_entry_time) & 
-                (market_data['Datetime'] <= max_exit_time)
-            ]
+            trade_end_idx = datetimes.searchsorted(max_exit_time, side='right')
             
             exit_price = None
             actual_exit_time = None
             
-            # Check each day for profit target
-            for date, daily_data in trade_data.groupby(trade_data['Datetime'].dt.date):
-                if action == 'BUY':
-                    if daily_data['High'].max() >= target_price:
-                        exit_price = target_price
-                        # Find the first time the target was hit
-                        actual_exit_time = daily_data.loc[
-                            daily_data['High'] >= target_price, 'Datetime'
-                        ].iloc[0]
-                        break
-                else:  # SHORT
-                    if daily_data['Low'].min() <= target_price:
-                        exit_price = target_price
-                        # Find the first time the target was hit
-                        actual_exit_time = daily_data.loc[
-                            daily_data['Low'] <= target_price, 'Datetime'
-                        ].iloc[0]
-                        break
+            # Find the first bar where the profit target was hit
+            if action == 'BUY':
+                target_hit = arrays['High'][entry_idx:trade_end_idx] >= target_price
+            else:  # SHORT
+                target_hit = arrays['Low'][entry_idx:trade_end_idx] <= target_price
+            if target_hit.any():
+                exit_price = target_price
+                actual_exit_time = datetimes[entry_idx + np.argmax(target_hit)]
             
             # If profit target wasn't hit, use max_exit_time
             if exit_price is None:
-                exit_mask = (market_data['Datetime'] >= max_exit_time)
-                if not any(exit_mask):
+                exit_idx = datetimes.searchsorted(max_exit_time, side='left')
+                if exit_idx == len(datetimes):
                     raise ValueError(f"No data available at or after exit time {max_exit_time}")
-                exit_price = market_data.loc[exit_mask].iloc[0]['Close']
-                actual_exit_time = market_data.loc[exit_mask].iloc[0]['Datetime']
+                exit_price = closes[exit_idx]
+                actual_exit_time = datetimes[exit_idx]
             
             # Calculate fees
             entry_value = entry_price * position_size
@@ -201,19 +279,7 @@ class BacktestFramework:
                 pnl = (entry_value - exit_value) - (entry_fee + exit_fee)
                 pnl_pct = ((entry_price - exit_price) / entry_price) * 100
             
-            # Record position
             direction = 'LONG' if action == 'BUY' else 'SHORT'
-            position = TradePosition(
-                entry_time=actual_entry_time,
-                entry_price=entry_price,
-                position_size=position_size,
-                direction=direction,
-                ticker=ticker,
-                agent_name=agent_name,
-                reasoning=reasoning
-            )
-            
-            self.current_positions[ticker] = position
             
             # Create trade result with appropriate exit reason
             exit_reason = (
@@ -251,7 +317,6 @@ class BacktestFramework:
             
             # Reset state
             self.trades = []
-            self.current_positions = {}
             
             # Track metrics
             metrics = {
@@ -262,30 +327,36 @@ class BacktestFramework:
                 'max_gain': 0.0
             }
             
+            # Per-ticker arrays, built once and shared by every response for that ticker
+            ticker_arrays = {}
+            
             # Process each agent response
             for response in agent_responses:
-                self.logger.info(f"Processing trade: {response}")
+                self.logger.info("Processing trade: %s", response)
                 
                 if not all(key in response for key in ['ticker', 'action', 'amount', 'expected_timeframe']):
-                    self.logger.error(f"Missing required fields in response: {response}")
+                    self.logger.error("Missing required fields in response: %s", response)
                     continue
                     
                 ticker = response['ticker']
                 if ticker not in market_data:
-                    self.logger.error(f"No market data for ticker {ticker}")
+                    self.logger.error("No market data for ticker %s", ticker)
                     continue
                     
                 # Get relevant market data
                 df = market_data[ticker]
                 if df.empty:
-                    self.logger.error(f"Empty market data for ticker {ticker}")
+                    self.logger.error("Empty market data for ticker %s", ticker)
                     continue
                 
                 try:
-                    result = self.execute_trade(
+                    if ticker not in ticker_arrays:
+                        ticker_arrays[ticker] = self._market_arrays(df)
+                        
+                    result = self._execute_on_arrays(
                         ticker=ticker,
                         action=response['action'],
-                        market_data=df,
+                        arrays=ticker_arrays[ticker],
                         position_size=float(response['amount']),
                         agent_name=response.get('persona', 'unknown'),
                         reasoning=response.get('reasoning', ''),
@@ -294,59 +365,41 @@ class BacktestFramework:
                     )
                     
                     if result:
-                        self.logger.info(f"Trade result: {result}")
+                        self.logger.info("Trade result: %s", result)
                         
                 except Exception as e:
-                    self.logger.error(f"Error executing trade: {str(e)}")
+                    self.logger.error("Error executing trade: %s", e)
                     continue
             
             # Calculate metrics
             if self.trades:
-                metrics.update({
-                    'win_rate': self._calculate_win_rate(self.trades),
-                    'avg_return': self._calculate_avg_return(self.trades),
-                    'max_loss': self._calculate_max_loss(self.trades),
-                    'max_gain': self._calculate_max_gain(self.trades)
-                })
+                metrics.update(self._calculate_performance_metrics(self.trades))
                 
-            self.logger.info(f"Backtest metrics: {metrics}")
+            self.logger.info("Backtest metrics: %s", metrics)
             return metrics, self.trades
     
-    def _calculate_win_rate(self, trades: List[TradeResult]) -> float:
-        """Calculate win rate for a list of trades."""
-        if not trades:
-            return 0.0
-        winning_trades = len([t for t in trades if t.pnl > 0])
-        return round((winning_trades / len(trades)) * 100, 2)
-    
-    def _calculate_avg_return(self, trades: List[TradeResult]) -> float:
-        """Calculate average return percentage."""
-        if not trades:
-            return 0.0
-        returns = [t.pnl_pct for t in trades]
-        return round(sum(returns) / len(returns), 2)
-    
-    def _calculate_max_loss(self, trades: List[TradeResult]) -> float:
-        """Calculate maximum loss percentage."""
-        if not trades:
-            return 0.0
-        returns = [t.pnl_pct for t in trades]
-        return round(min(returns), 2)
-    
-    def _calculate_max_gain(self, trades: List[TradeResult]) -> float:
-        """Calculate maximum gain percentage."""
+    def _calculate_performance_metrics(self, trades: List[TradeResult]) -> Dict[str, float]:
+        """Calculate win rate and return statistics for a list of trades."""
         if not trades:
-            return 0.0
-        returns = [t.pnl_pct for t in trades]
-        return round(max(returns), 2)
+            return {'win_rate': 0.0, 'avg_return': 0.0, 'max_loss': 0.0, 'max_gain': 0.0}
+            
+        # Pull PnL columns out once and reduce them in NumPy
+        pnl = np.fromiter((t.pnl for t in trades), dtype=np.float64, count=len(trades))
+        pnl_pct = np.fromiter((t.pnl_pct for t in trades), dtype=np.float64, count=len(trades))
+        return {
+            'win_rate': round(float((pnl > 0).mean()) * 100, 2),
+            'avg_return': round(float(pnl_pct.mean()), 2),
+            'max_loss': round(float(pnl_pct.min()), 2),
+            'max_gain': round(float(pnl_pct.max()), 2)
+        }
     
     def _format_trade(self, trade: TradeResult) -> Dict:
         """Format trade result for reporting."""
         return {
             'ticker': trade.ticker,
             'direction': trade.direction,
-            'entry_time': trade.entry_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'exit_time': trade.exit_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'entry_time': trade.entry_time,
+            'exit_time': trade.exit_time,
             'entry_price': round(trade.entry_price, 4),
             'exit_price': round(trade.exit_price, 4),
             'position_size': trade.position_size,
@@ -366,21 +419,23 @@ class BacktestFramework:
                 'unique_tickers': len(set(t.ticker for t in self.trades)),
                 'unique_agents': len(set(t.agent_name for t in self.trades))
             },
-            'performance_metrics': {
-                'win_rate': self._calculate_win_rate(self.trades),
-                'avg_return': self._calculate_avg_return(self.trades),
-                'max_loss': self._calculate_max_loss(self.trades),
-                'max_gain': self._calculate_max_gain(self.trades)
-            },
+            'performance_metrics': self._calculate_performance_metrics(self.trades),
             'trade_log': [self._format_trade(trade) for trade in self.trades]
         }
         
+        # Serialize once; orjson writes datetimes as ISO-8601 and handles NumPy scalars
+        payload = orjson.dumps(
+            metrics,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        )
+        
         if output_dir:
             output_dir = Path(output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
             report_path = output_dir / f"backtest_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(report_path, 'w') as f:
-                json.dump(metrics, indent=2, fp=f)
+            with open(report_path, 'wb') as f:
+                f.write(payload)
         
-        return json.dumps(metrics, indent=2)
+        return payload.decode()
     
\ No newline at end of file
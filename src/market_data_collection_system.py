@@ -1,10 +1,48 @@
 import yfinance as yf
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import logging
 from datetime import datetime, timedelta
 import os
+from functools import lru_cache
 from typing import List, Dict
-import time
+
+# Columns kept from the yfinance download when reading ticker data back
+DATA_COLUMNS = ['Datetime', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# Market data is stored as one Hive-partitioned dataset: <data_folder>/ticker=XYZ/part-0.parquet
+PARTITION_KEY = 'ticker'
+ROW_GROUP_SIZE = 8192
+
+# Subset of major NASDAQ stocks used for testing
+NASDAQ100_TICKERS = (
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "PYPL", "INTC", "CSCO", "CMCSA", "ADBE", "QCOM", "TXN", "TMUS", "ABNB", "BKNG", "AMD", "SBUX", "INTU", "CHTR", "ISRG", "MDLZ", "GILD", "LRCX", "REGN", "ADI", "AMAT", "MRVL", "ASML", "MRNA", "KLAC", "MU", "MNST", "AVGO", "TEAM", "DXCM", "ILMN", "BIIB", "SNPS", "CDNS", "ALGN", "WDAY", "IDXX", "NXPI", "FTNT", "CTSH", "EA", "VRSK", "PAYX", "ROST", "ODFL", "CPRT", "ADSK", "FAST", "DLTR", "CTAS", "ZM", "PANW", "VRTX", "CRWD", "EBAY", "MCHP", "DDOG", "XEL", "ANSS", "SWKS", "SIRI", "MTCH", "OKTA", "DOCU", "ZS", "ULTA", "CDW", "FANG", "ETSY", "TTWO", "WBA", "LCID", "RIVN", "PCAR", "ORLY", "MAR", "COST", "PDD", "JD", "DASH", "COIN", "LULU", "ROKU", "NET", "TTD", "RBLX", "SOFI", "UPST", "PLTR"
+)
+
+def partition_files(data_folder: str, ticker: str) -> List[str]:
+    """
+    Paths of the Parquet files in a ticker's partition. Empty when the partition is
+    missing or was left without data files (e.g. by a failed write).
+    """
+    ticker_dir = os.path.join(data_folder, f"{PARTITION_KEY}={ticker}")
+    if not os.path.isdir(ticker_dir):
+        return []
+    return [
+        os.path.join(ticker_dir, name)
+        for name in os.listdir(ticker_dir)
+        if name.endswith('.parquet')
+    ]
+
+@lru_cache(maxsize=256)
+def _load_cached(path: str, mtime: int) -> pd.DataFrame:
+    """Read a ticker partition; `mtime` is only part of the key so refreshed files miss the cache."""
+    # Memory-mapped pages, column chunks decoded on Arrow's thread pool; Arrow
+    # buffers are released as pandas takes them over to keep peak memory down
+    table = pq.read_table(path, columns=DATA_COLUMNS, memory_map=True, use_threads=True)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
 
 class MarketDataCollector:
     def __init__(self, data_folder: str = "market_data"):
@@ -13,18 +51,39 @@ class MarketDataCollector:
         if not os.path.exists(data_folder):
             os.makedirs(data_folder)
             
+    def _ticker_dir(self, ticker: str) -> str:
+        """Path of the dataset partition holding a ticker's data."""
+        return os.path.join(self.data_folder, f"{PARTITION_KEY}={ticker}")
+
+    def _write_ticker_data(self, ticker: str, df: pd.DataFrame) -> None:
+        """Replace a ticker's partition with the given data, sorted by Datetime."""
+        df = df.sort_values('Datetime')
+        df[PARTITION_KEY] = ticker
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        
+        # Sorted rows keep each row group's Datetime min/max tight for pruning on read
+        ds.write_dataset(
+            table,
+            self.data_folder,
+            format='parquet',
+            partitioning=[PARTITION_KEY],
+            partitioning_flavor='hive',
+            basename_template='part-{i}.parquet',
+            max_rows_per_group=ROW_GROUP_SIZE,
+            file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+            existing_data_behavior='delete_matching'
+        )
+
     def get_nasdaq100_tickers(self) -> List[str]:
         """Get a subset of major NASDAQ stocks for testing."""
-        return [
-            "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "PYPL", "INTC", "CSCO", "CMCSA", "ADBE", "QCOM", "TXN", "TMUS", "ABNB", "BKNG", "AMD", "SBUX", "INTU", "CHTR", "ISRG", "MDLZ", "GILD", "LRCX", "REGN", "ADI", "AMAT", "MRVL", "ASML", "MRNA", "KLAC", "MU", "MNST", "AVGO", "TEAM", "DXCM", "ILMN", "BIIB", "SNPS", "CDNS", "ALGN", "WDAY", "IDXX", "NXPI", "FTNT", "CTSH", "EA", "VRSK", "PAYX", "ROST", "ODFL", "CPRT", "ADSK", "FAST", "DLTR", "CTAS", "ZM", "PANW", "VRTX", "CRWD", "EBAY", "MCHP", "DDOG", "XEL", "ANSS", "SWKS", "SIRI", "MTCH", "OKTA", "DOCU", "ZS", "ULTA", "CDW", "FANG", "ETSY", "TTWO", "WBA", "LCID", "RIVN", "PCAR", "ORLY", "MAR", "COST", "PDD", "JD", "DASH", "COIN", "LULU", "ROKU", "NET", "TTD", "RBLX", "SOFI", "UPST", "PLTR"
-        ]
+        return list(NASDAQ100_TICKERS)
     
     def collect_historical_data(self, lookback_days: int = 14) -> None:
         """Collect hourly data for all stocks for the specified period."""
         end_date = datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
         
-        tickers = self.get_nasdaq100_tickers()
+        tickers = NASDAQ100_TICKERS
         
         # Create a metadata file with collection timestamp
         metadata = {
@@ -38,38 +97,48 @@ class MarketDataCollector:
             f"{self.data_folder}/metadata.csv", index=False
         )
         
-        # Collect data for each ticker
+        # Download all tickers in one call; yfinance fetches them on a thread pool
+        print(f"Collecting data for {len(tickers)} tickers...")
+        data = yf.download(
+            tickers=' '.join(tickers),
+            start=start_date,
+            end=end_date,
+            interval='1h',
+            group_by='ticker',
+            threads=True,
+            auto_adjust=True,
+            progress=False
+        )
+        
+        # Save each ticker separately so one bad symbol doesn't drop the rest
         for ticker in tickers:
             try:
-                print(f"Collecting data for {ticker}...")
-                stock = yf.Ticker(ticker)
-                df = stock.history(
-                    start=start_date,
-                    end=end_date,
-                    interval='1h'
-                )
+                df = data.xs(ticker, level=0, axis=1).dropna(how='all')
                 
                 if not df.empty:
-                    # Add ticker column and reset index to make datetime a column
-                    df['Ticker'] = ticker
-                    df.reset_index(inplace=True)
+                    # Reset index to make datetime a column
+                    df = df.reset_index()
                     
-                    # Save to CSV
-                    filename = f"{self.data_folder}/{ticker}_hourly.csv"
-                    df.to_csv(filename, index=False)
+                    # Save to the ticker's Parquet partition
+                    self._write_ticker_data(ticker, df)
+                else:
+                    print(f"No data returned for {ticker}")
                     
-                # Sleep to avoid hitting rate limits
-                time.sleep(1)
-                
             except Exception as e:
                 print(f"Error collecting data for {ticker}: {str(e)}")
                 continue
 
     def load_ticker_data(self, ticker: str) -> pd.DataFrame:
         """Load data for a specific ticker."""
-        filename = f"{self.data_folder}/{ticker}_hourly.csv"
-        if os.path.exists(filename):
-            return pd.read_csv(filename)
+        ticker_dir = self._ticker_dir(ticker)
+        files = partition_files(self.data_folder, ticker)
+        if files:
+            # Newest modification time in the partition, so rewrites by collect_historical_data invalidate
+            mtime = max(
+                [os.stat(ticker_dir).st_mtime_ns] +
+                [os.stat(path).st_mtime_ns for path in files]
+            )
+            return _load_cached(ticker_dir, mtime).copy()
         return pd.DataFrame()
 
     def get_data_for_analysis(self, tickers: List[str], 
@@ -83,9 +152,6 @@ class MarketDataCollector:
         for ticker in tickers:
             df = self.load_ticker_data(ticker)
             if not df.empty:
-                # Convert datetime column
-                df['Datetime'] = pd.to_datetime(df['Datetime'])
-                
                 # Filter by date range
                 mask = (df['Datetime'] >= start_date) & (df['Datetime'] <= end_date)
                 df = df[mask]
@@ -106,50 +172,71 @@ class MarketDataCollector:
     def get_historical_data(self, start_date: datetime, end_date: datetime, resolution: str = 'hourly') -> Dict[str, pd.DataFrame]:
         """Collect historical data for a specific date range, preferring local data."""
         logger = logging.getLogger(__name__)
-        logger.info(f"\n{'='*80}\nAttempting to load market data:")
-        logger.info(f"Date range: {start_date} to {end_date}")
+        logger.info("\n%s\nAttempting to load market data:", '=' * 80)
+        logger.info("Date range: %s to %s", start_date, end_date)
         
-        tickers = self.get_nasdaq100_tickers()
-        logger.info(f"Looking for data for {len(tickers)} tickers")
+        tickers = NASDAQ100_TICKERS
+        logger.info("Looking for data for %d tickers", len(tickers))
         
         historical_data = {}
         missing_files = []
         empty_data = []
         loaded_files = []
         
-        # Check local data first
+        available = []
+        paths = []
         for ticker in tickers:
-            filename = f"{self.data_folder}/{ticker}_hourly.csv"
-            if not os.path.exists(filename):
+            # A partition left without Parquet files counts as missing
+            ticker_paths = partition_files(self.data_folder, ticker)
+            if ticker_paths:
+                available.append(ticker)
+                paths.extend(ticker_paths)
+            else:
                 missing_files.append(ticker)
-                continue
-                
-            df = pd.read_csv(filename)
-            df['Datetime'] = pd.to_datetime(df['Datetime'])
-            
-            # Filter by date range
-            mask = (df['Datetime'] >= start_date) & (df['Datetime'] <= end_date)
-            filtered_df = df[mask]
+        
+        # Read every requested partition in one scan; row groups outside the
+        # date range are skipped using the Parquet Datetime min/max statistics
+        if paths:
+            dataset = ds.dataset(
+                paths,
+                format='parquet',
+                partitioning='hive',
+                partition_base_dir=self.data_folder
+            )
+            datetime_type = dataset.schema.field('Datetime').type
+            table = dataset.to_table(
+                columns=DATA_COLUMNS + [PARTITION_KEY],
+                filter=(
+                    (pc.field('Datetime') >= self._datetime_scalar(start_date, datetime_type)) &
+                    (pc.field('Datetime') <= self._datetime_scalar(end_date, datetime_type)) &
+                    pc.field(PARTITION_KEY).isin(available)
+                )
+            )
+            frames = table.to_pandas()
+            for ticker, df in frames.groupby(PARTITION_KEY, sort=False):
+                df = df.drop(columns=PARTITION_KEY).reset_index(drop=True)
+                # The scan projected DATA_COLUMNS, so consumers can skip their column checks
+                df.attrs['schema_ok'] = True
+                historical_data[ticker] = df
             
-            if filtered_df.empty:
-                empty_data.append(ticker)
-                continue
-                
-            historical_data[ticker] = filtered_df
-            loaded_files.append(ticker)
+            for ticker in available:
+                if ticker in historical_data:
+                    loaded_files.append(ticker)
+                else:
+                    empty_data.append(ticker)
     
         # Log detailed summary
         logger.info("\nData Loading Summary:")
         if loaded_files:
-            logger.info(f"Successfully loaded data for: {', '.join(loaded_files)}")
+            logger.info("Successfully loaded data for: %s", loaded_files)
         if missing_files:
-            logger.warning(f"Missing files for: {', '.join(missing_files)}")
+            logger.warning("Missing files for: %s", missing_files)
         if empty_data:
-            logger.warning(f"No data in date range for: {', '.join(empty_data)}")
+            logger.warning("No data in date range for: %s", empty_data)
             
         if not historical_data:
             logger.error("NO VALID MARKET DATA FOUND!")
-            logger.error(f"Data folder: {os.path.abspath(self.data_folder)}")
+            logger.error("Data folder: %s", os.path.abspath(self.data_folder))
             
             # Check if directory exists
             if not os.path.exists(self.data_folder):
@@ -157,11 +244,46 @@ class MarketDataCollector:
             else:
                 # List what files are actually there
                 actual_files = os.listdir(self.data_folder)
-                logger.info(f"Files found in directory: {actual_files}")
+                logger.info("Files found in directory: %s", actual_files)
         
-        logger.info(f"{'='*80}\n")
+        logger.info("%s\n", '=' * 80)
         return historical_data
 
+    @staticmethod
+    def _datetime_scalar(value: datetime, datetime_type: pa.DataType) -> pa.Scalar:
+        """Convert a filter bound to an Arrow scalar comparable with the Datetime column."""
+        value = pd.Timestamp(value)
+        if datetime_type.tz is not None:
+            value = value.tz_localize(datetime_type.tz) if value.tz is None else value.tz_convert(datetime_type.tz)
+        elif value.tz is not None:
+            raise ValueError("Cannot compare timezone-aware dates with timezone-naive market data")
+        return pa.scalar(value, type=datetime_type)
+
+    def convert_csv_to_parquet(self, remove_csv: bool = False) -> List[str]:
+        """
+        One-shot migration of legacy `<TICKER>_hourly.csv` files to the Parquet dataset.
+        Returns the list of tickers that were converted.
+        """
+        converted = []
+        for filename in sorted(os.listdir(self.data_folder)):
+            if not filename.endswith('_hourly.csv'):
+                continue
+                
+            ticker = filename[:-len('_hourly.csv')]
+            csv_path = os.path.join(self.data_folder, filename)
+            try:
+                df = pd.read_csv(csv_path)
+                df['Datetime'] = pd.to_datetime(df['Datetime'], utc=True).dt.tz_convert('America/New_York')
+                self._write_ticker_data(ticker, df[DATA_COLUMNS])
+                if remove_csv:
+                    os.remove(csv_path)
+                converted.append(ticker)
+            except Exception as e:
+                print(f"Error converting data for {ticker}: {str(e)}")
+                continue
+                
+        return converted
+
 def main():
     # Initialize collector
     collector = MarketDataCollector()
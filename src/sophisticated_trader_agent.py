@@ -1,12 +1,174 @@
+import asyncio
 import json
-import requests
+import string
+import httpx
+import orjson
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional, Union
 from pathlib import Path
 from datetime import datetime
 from src.validators.llm_response_validator import LLMResponseValidator
+from src.utilities import fast_stats
 import random
+from functools import lru_cache
+
+# Generation can take minutes on a local model; only connecting should fail fast
+LLM_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+# Tickers the agent may request; the tuple keeps prompt order, the set is for lookups
+AVAILABLE_TICKERS = (
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "PYPL", "INTC", "CSCO", "CMCSA", "ADBE", "QCOM", "TXN", "TMUS", "ABNB", "BKNG", "AMD", "SBUX", "INTU", "CHTR", "ISRG", "MDLZ", "GILD", "LRCX", "REGN", "ATVI", "ADI", "AMAT", "MRVL", "ASML", "MRNA", "KLAC", "MU", "MNST", "AVGO", "TEAM", "DXCM", "ILMN", "BIIB", "SNPS", "CDNS", "ALGN", "WDAY", "IDXX", "NXPI", "FTNT", "CTSH", "EA", "VRSK", "PAYX", "ROST", "ODFL", "CPRT", "ADSK", "FAST", "DLTR", "CTAS", "ZM", "PANW", "VRTX", "CRWD", "EBAY", "MCHP", "DDOG", "XEL", "ANSS", "SPLK", "SWKS", "SIRI", "MTCH", "OKTA", "DOCU", "SGEN", "ZS", "ULTA", "CDW", "FANG", "ETSY", "TTWO", "WBA", "LCID", "RIVN", "PCAR", "ORLY", "MAR", "COST", "PDD", "JD", "DASH", "COIN", "LULU", "ROKU", "NET", "TTD", "RBLX", "SOFI", "UPST", "PLTR"
+)
+AVAILABLE_TICKERS_SET = frozenset(AVAILABLE_TICKERS)
+
+FORMAT_NOTES = """
+CRITICAL FORMATTING REQUIREMENTS:
+1. Return ONLY the JSON object
+2. NO text before or after the JSON
+3. NO explanations, NO roleplay, NO additional commentary
+4. NO confirmation messages like "I hope this helps" or "Let me know if you need anything else"
+5. The response must start with { and end with }
+6. The JSON object MUST include only these fields:
+   {
+     "tickers": ["TICKER1", "TICKER2" ...],   // MUST be of the available tickers
+     "timeframe": {
+       "start": "YYYY-MM-DD",
+       "end": "YYYY-MM-DD",
+       "resolution": "hourly"
+     }
+
+   }
+
+"""
+
+# Trading-decision prompt; only the ticker lists and market summary vary per call
+_DECISION_TMPL = string.Template("""
+CRITICAL RESTRICTIONS:
+1. You can ONLY trade these tickers: $tickers_csv
+2. Any other tickers will cause the trade to fail
+3. Consider ALL available options - don't default to first choices
+4. Base decisions on market data analysis, not option ordering
+5. Vary your choices based on market conditions
+
+TASK: Make ONE specific trading decision based on the market data.
+
+Market Data Summary:
+$data_summary
+
+Trading Information:
+- Entry: All trades enter at the next available closing price
+- Exit occurs at whichever comes first:
+  1. Profit Target: When daily high/low hits target price
+     * LONG: exits at entry_price * (1 + expected_profit_percentage)
+     * SHORT: exits at entry_price * (1 - expected_profit_percentage)
+  2. Time Limit: At closing price of expected_timeframe if target not hit
+- No stop-losses implemented
+- Trading fees apply to both entry and exit
+
+RESPONSE FORMAT:
+Return ONLY a JSON object with EXACTLY these fields:
+{
+    "action": ,         // Must be one of: SHORT, PUT, SELL, BUY  
+    "ticker": ,         // Must be one from: $shuffled_csv
+    "expected_timeframe": ,  // Must be one of: 5d,2d,13d,1d,3d,...  
+    "amount": ,         // Number of shares (10-1000)
+    "expected_profit_percentage":    // Expected return (0.01 to 0.20)
+}
+
+CRITICAL:
+1. ONLY return the JSON object
+2. NO text before or after
+3. Start with { and end with }
+4. ONLY use tickers from the provided list
+""")
+
+# Separates persona prompts in a batched data request
+PERSONA_BREAK = "\n---PERSONA-BREAK---\n"
+
+_BATCH_DATA_TMPL = string.Template("""
+AVAILABLE TICKERS: $tickers_csv
+
+TASK: Select stocks to analyze for EACH of the $count trading personas above,
+separated by ---PERSONA-BREAK---, based on that persona.
+Your response MUST be a JSON array of exactly $count objects, one per persona
+in the same order, each matching this EXACT format:
+{
+  "tickers": ["TICKER1", "TICKER2" ...],   // MUST be of the available tickers
+  "timeframe": {
+    "start": "YYYY-MM-DD",
+    "end": "YYYY-MM-DD",
+    "resolution": "hourly"
+  }
+}
+
+REQUIREMENTS:
+1. 'tickers' must be an array of 2-5 valid ticker symbols
+2. 'timeframe' must be an object with start, end, and resolution fields
+3. 'resolution' must be "hourly"
+4. Return ONLY the JSON array, NO additional text
+""")
+
+@lru_cache(maxsize=128)
+def _read_persona(path: str, mtime: int) -> str:
+    """Read a persona prompt; `mtime` is only part of the key so edited files miss the cache."""
+    return Path(path).read_text().strip()
+
+@lru_cache(maxsize=128)
+def _full_base_prompt(persona_prompt: str) -> str:
+    """Persona prompt followed by the ticker universe and format notes."""
+    return f"{persona_prompt}\n\nAVAILABLE TICKERS: {', '.join(AVAILABLE_TICKERS)}\n{FORMAT_NOTES}"
+
+# JSON schemas passed as Ollama's `format`, so generation is constrained to
+# exactly the expected object and the reply needs no extraction or repair
+_DATA_REQUEST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tickers": {
+            "type": "array",
+            "items": {"enum": list(AVAILABLE_TICKERS)},
+            "minItems": 2,
+            "maxItems": 5
+        },
+        "timeframe": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "string", "format": "date"},
+                "end": {"type": "string", "format": "date"},
+                "resolution": {"enum": ["hourly"]}
+            },
+            "required": ["start", "end", "resolution"]
+        }
+    },
+    "required": ["tickers", "timeframe"]
+}
+
+def _decision_schema(requested_tickers: List[str]) -> Dict[str, Any]:
+    """Schema for a trading decision restricted to the requested tickers."""
+    return {
+        "type": "object",
+        "properties": {
+            "action": {"enum": ["BUY", "SELL", "SHORT", "PUT"]},
+            "ticker": {"enum": list(requested_tickers)},
+            "expected_timeframe": {"type": "string", "pattern": "^[0-9]+[dw]$"},
+            "amount": {"type": "number"},
+            "expected_profit_percentage": {"type": "number"}
+        },
+        "required": ["action", "ticker", "expected_timeframe", "amount", "expected_profit_percentage"]
+    }
+
+async def _iter_ndjson(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """Parse an NDJSON response body line by line with orjson, straight from the raw bytes."""
+    pending = b''
+    async for data in response.aiter_bytes():
+        pending += data
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield orjson.loads(line)
+    if pending.strip():
+        yield orjson.loads(pending)
 
 class TradingError(Exception):
     """Custom exception for trading-related errors."""
@@ -17,58 +179,55 @@ class LLMResponseError(TradingError):
     pass
 
 class SophisticatedTrader:
-    def __init__(self, persona_file: str, prompts_dir: str = "prompts"):
+    def __init__(
+        self,
+        persona_file: Union[str, Path],
+        prompts_dir: Union[str, Path] = "prompts",
+        client: Optional[httpx.AsyncClient] = None,
+        seed: Optional[int] = None
+    ):
         """
         Initialize trader with a specific trading persona.
         
         Args:
-            persona_file (str): Name of the file containing the persona prompt
-            prompts_dir (str): Directory containing the prompt files
+            persona_file (str | Path): Name of the persona prompt file in
+                prompts_dir, or a path to it (e.g. from prompts_dir.glob)
+            prompts_dir (str | Path): Directory containing the prompt files
+            client (httpx.AsyncClient): Shared HTTP client for LLM calls; a
+                short-lived one is opened per call when omitted
+            seed (int): Seed for the ticker shuffling in the decision prompt,
+                for reproducible runs
         """
-        self.available_tickers = [
-            "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "PYPL", "INTC", "CSCO", "CMCSA", "ADBE", "QCOM", "TXN", "TMUS", "ABNB", "BKNG", "AMD", "SBUX", "INTU", "CHTR", "ISRG", "MDLZ", "GILD", "LRCX", "REGN", "ATVI", "ADI", "AMAT", "MRVL", "ASML", "MRNA", "KLAC", "MU", "MNST", "AVGO", "TEAM", "DXCM", "ILMN", "BIIB", "SNPS", "CDNS", "ALGN", "WDAY", "IDXX", "NXPI", "FTNT", "CTSH", "EA", "VRSK", "PAYX", "ROST", "ODFL", "CPRT", "ADSK", "FAST", "DLTR", "CTAS", "ZM", "PANW", "VRTX", "CRWD", "EBAY", "MCHP", "DDOG", "XEL", "ANSS", "SPLK", "SWKS", "SIRI", "MTCH", "OKTA", "DOCU", "SGEN", "ZS", "ULTA", "CDW", "FANG", "ETSY", "TTWO", "WBA", "LCID", "RIVN", "PCAR", "ORLY", "MAR", "COST", "PDD", "JD", "DASH", "COIN", "LULU", "ROKU", "NET", "TTD", "RBLX", "SOFI", "UPST", "PLTR"
-        ]
+        self.available_tickers = AVAILABLE_TICKERS
         self.prompts_dir = Path(prompts_dir)
-        self.persona_file = persona_file
-        self.persona_path = self.prompts_dir / persona_file
-        self.persona_name = Path(persona_file).stem
+        self.persona_file = persona_file = Path(persona_file)
+        if persona_file.is_absolute() or persona_file.parent != Path('.'):
+            self.persona_path = persona_file
+        else:
+            self.persona_path = self.prompts_dir / persona_file
+        self.persona_name = persona_file.stem
         self.logger = logging.getLogger(__name__)
+        self.client = client
+        self._rng = random.Random(seed)
         self._load_persona()
+        # Built once per persona text; both prompts open with the persona text so
+        # Ollama can reuse its cached context between the two calls
+        self._full_base_prompt = _full_base_prompt(self.base_prompt)
         self.validator = LLMResponseValidator()
         
     def _load_persona(self):
         """Load the trading persona from file."""
         try:
-            with open(self.persona_path, 'r') as f:
-                self.base_prompt = f.read().strip()
+            self.base_prompt = _read_persona(str(self.persona_path), self.persona_path.stat().st_mtime_ns)
         except FileNotFoundError:
-            raise FileNotFoundError(f"Persona file {self.persona_file} not found in {self.prompts_dir}")
+            raise FileNotFoundError(f"Persona file {self.persona_file.name} not found in {self.persona_path.parent}")
             
     def _get_base_prompt(self) -> str:
         """Get the complete base prompt including format notes and available tickers."""
-        format_notes = """
-CRITICAL FORMATTING REQUIREMENTS:
-1. Return ONLY the JSON object
-2. NO text before or after the JSON
-3. NO explanations, NO roleplay, NO additional commentary
-4. NO confirmation messages like "I hope this helps" or "Let me know if you need anything else"
-5. The response must start with { and end with }
-6. The JSON object MUST include only these fields:
-   {
-     "tickers": ["TICKER1", "TICKER2" ...],   // MUST be of the available tickers
-     "timeframe": {
-       "start": "YYYY-MM-DD",
-       "end": "YYYY-MM-DD",
-       "resolution": "hourly"
-     }
+        return self._full_base_prompt
 
-   }
 
-"""
-        return f"{self.base_prompt}\n\nAVAILABLE TICKERS: {', '.join(self.available_tickers)}\n{format_notes}"
-
-
-    def request_data(self) -> Dict[str, Any]:
+    async def request_data(self) -> Dict[str, Any]:
         """Request market data to analyze."""
         example_format = """
 TASK: Select stocks to analyze based on your persona.
@@ -81,11 +240,11 @@ REQUIREMENTS:
 4. Return ONLY the JSON object, NO additional text
 """
         prompt = self._get_base_prompt() + example_format
-        response = self._get_llm_response(prompt)
+        response = await self._get_llm_response(prompt, _DATA_REQUEST_SCHEMA)
         try:
             validated_response = self.validator.validate_data_request(
                 response, 
-                self.available_tickers
+                AVAILABLE_TICKERS_SET
             )
             return validated_response
         except ValueError as e:
@@ -107,63 +266,96 @@ REQUIREMENTS:
             
         return response
     
-    def analyze_and_trade(self, market_data: Dict[str, pd.DataFrame], requested_tickers: list) -> Dict[str, Any]:
+    @classmethod
+    async def request_data_batch(
+        cls,
+        traders: List['SophisticatedTrader'],
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Any]:
+        """
+        Request market data for several traders with a single LLM call.
+        
+        Traders whose entry in the batched answer is missing or invalid fall
+        back to their own request_data(). Returns one entry per trader: the
+        validated data request, or the exception its fallback raised.
+        Each LLM call holds `semaphore`, when given, to cap concurrent requests.
+        """
+        if not traders:
+            return []
+            
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(len(traders))  # No cap beyond one call per trader
+            
+        batch = []
+        if len(traders) > 1:
+            prompt = PERSONA_BREAK.join(trader.base_prompt for trader in traders) + _BATCH_DATA_TMPL.substitute(
+                tickers_csv=', '.join(AVAILABLE_TICKERS),
+                count=len(traders)
+            )
+            try:
+                async with semaphore:
+                    batch = await traders[0]._get_llm_batch_response(prompt, {
+                        "type": "array",
+                        "items": _DATA_REQUEST_SCHEMA,
+                        "minItems": len(traders),
+                        "maxItems": len(traders)
+                    })
+            except LLMResponseError as e:
+                traders[0].logger.warning("Batched data request failed, asking each persona: %s", e)
+            if not isinstance(batch, list) or len(batch) != len(traders):
+                batch = []
+                
+        results = [None] * len(traders)
+        retry = []
+        for i, trader in enumerate(traders):
+            try:
+                results[i] = trader.validator.validate_data_request(batch[i], AVAILABLE_TICKERS_SET)
+            except (IndexError, TypeError, ValueError):
+                retry.append(i)
+                
+        async def fallback(trader: 'SophisticatedTrader') -> Dict[str, Any]:
+            async with semaphore:
+                return await trader.request_data()
+                
+        if retry:
+            fallbacks = await asyncio.gather(
+                *(fallback(traders[i]) for i in retry),
+                return_exceptions=True
+            )
+            for i, result in zip(retry, fallbacks):
+                results[i] = result
+                
+        return results
+    
+    async def analyze_and_trade(self, market_data: Dict[str, pd.DataFrame], requested_tickers: list) -> Dict[str, Any]:
         """Analyze provided market data and make trading decisions."""
         data_summary = self._format_market_data(market_data)
         
-        example_format = f"""
-CRITICAL RESTRICTIONS:
-1. You can ONLY trade these tickers: {', '.join(requested_tickers)}
-2. Any other tickers will cause the trade to fail
-3. Consider ALL available options - don't default to first choices
-4. Base decisions on market data analysis, not option ordering
-5. Vary your choices based on market conditions
-
-TASK: Make ONE specific trading decision based on the market data.
-
-Market Data Summary:
-{data_summary}
-
-Trading Information:
-- Entry: All trades enter at the next available closing price
-- Exit occurs at whichever comes first:
-  1. Profit Target: When daily high/low hits target price
-     * LONG: exits at entry_price * (1 + expected_profit_percentage)
-     * SHORT: exits at entry_price * (1 - expected_profit_percentage)
-  2. Time Limit: At closing price of expected_timeframe if target not hit
-- No stop-losses implemented
-- Trading fees apply to both entry and exit
-
-RESPONSE FORMAT:
-Return ONLY a JSON object with EXACTLY these fields:
-{{
-    "action": ,         // Must be one of: SHORT, PUT, SELL, BUY  
-    "ticker": ,         // Must be one from: {random.sample(requested_tickers, len(requested_tickers))}
-    "expected_timeframe": ,  // Must be one of: 5d,2d,13d,1d,3d,...  
-    "amount": ,         // Number of shares (10-1000)
-    "expected_profit_percentage":    // Expected return (0.01 to 0.20)
-}}
-
-CRITICAL:
-1. ONLY return the JSON object
-2. NO text before or after
-3. Start with {{ and end with }}
-4. ONLY use tickers from the provided list
-"""
+        # Shuffle the listed options so the model doesn't just take the first one
+        shuffled = list(requested_tickers)
+        self._rng.shuffle(shuffled)
+        example_format = _DECISION_TMPL.substitute(
+            tickers_csv=', '.join(requested_tickers),
+            shuffled_csv=', '.join(shuffled),
+            data_summary=data_summary
+        )
         
         try:
             # Get trading decision
-            decision = self._get_llm_response(example_format)
+            decision = await self._get_llm_response(
+                f"{self.base_prompt}\n{example_format}",
+                _decision_schema(requested_tickers)
+            )
             # Add validation:
             try:
                 validated_decision = self.validator.validate_trading_decision(
                     decision,
-                    requested_tickers
+                    frozenset(requested_tickers)
                 )
                 return validated_decision
             except ValueError as e:
                 raise LLMResponseError(f"Invalid trading decision: {str(e)}")
-            self.logger.info(f"Raw trading decision: {decision}")
+            self.logger.info("Raw trading decision: %s", decision)
             
             # Validate decision
             required_fields = ['action', 'ticker', 'amount']
@@ -183,50 +375,22 @@ CRITICAL:
             return decision
             
         except Exception as e:
-            self.logger.error(f"Error in analyze_and_trade: {str(e)}")
+            self.logger.error("Error in analyze_and_trade: %s", e)
             raise ValueError(f"Error in analyze_and_trade: {str(e)}")
     
-    def _get_llm_response(self, prompt: str) -> Dict[str, Any]:
-        """Get response from local Llama2 model and extract valid JSON."""
-        url = "http://localhost:11434/api/generate"
-        
-        data = {
-            "model": "llama2",
-            "prompt": prompt + "\n\nIMPORTANT: Return ONLY a complete, valid JSON object. NO narrative text, NO roleplay, NO additional text before or after the JSON.",
-            "stream": False
-        }
-        
+    async def _get_llm_response(self, prompt: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Get a JSON object matching `schema` from the local Llama2 model."""
         try:
-            response = requests.post(url, json=data)
-            if response.status_code != 200:
-                raise LLMResponseError(f"LLM API error: {response.status_code}")
+            response_text = await self._generate(
+                prompt + "\n\nIMPORTANT: Return ONLY a complete, valid JSON object. NO narrative text, NO roleplay, NO additional text before or after the JSON.",
+                schema
+            )
             
-            response_text = response.json()['response'].strip()
-            print("\nRaw LLM response:", response_text)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Raw LLM response: %s", response_text)
             
-            # Find JSON in the response
             try:
-                # Remove any text before the first {
-                start_idx = response_text.find('{')
-                if start_idx == -1:
-                    raise LLMResponseError("No JSON object found in response")
-                    
-                # Remove any text after the last }
-                end_idx = response_text.rfind('}')
-                if end_idx == -1:
-                    raise LLMResponseError("No closing brace found in response")
-                    
-                # Extract the JSON string
-                json_str = response_text[start_idx:end_idx + 1]
-                
-                # Parse the JSON
-                try:
-                    result = json.loads(json_str)
-                except json.JSONDecodeError:
-                    # Try to clean up common issues
-                    json_str = json_str.replace('\n', ' ').replace('\r', '')
-                    json_str = ' '.join(json_str.split())  # Normalize whitespace
-                    result = json.loads(json_str)
+                result = orjson.loads(response_text)
                 
                 # Additional validation for timeframe format
                 if 'timeframe' in result:
@@ -237,28 +401,137 @@ CRITICAL:
                 
                 return result
                 
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 raise LLMResponseError(f"Invalid JSON in response: {str(e)}\nProblematic response: {response_text}")
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise LLMResponseError(f"Failed to connect to LLM API: {str(e)}")
         except Exception as e:
             raise LLMResponseError(f"Unexpected error: {str(e)}")
         
+    async def _get_llm_batch_response(self, prompt: str, schema: Dict[str, Any]) -> List[Any]:
+        """Get a JSON array matching `schema` from the local Llama2 model."""
+        try:
+            response_text = await self._generate(
+                prompt + "\n\nIMPORTANT: Return ONLY a complete, valid JSON array. NO narrative text, NO roleplay, NO additional text before or after the JSON.",
+                schema,
+                brackets='[]'
+            )
+            return orjson.loads(response_text)
+            
+        except orjson.JSONDecodeError as e:
+            raise LLMResponseError(f"Invalid JSON in response: {str(e)}")
+        except httpx.HTTPError as e:
+            raise LLMResponseError(f"Failed to connect to LLM API: {str(e)}")
+            
+    async def _generate(self, prompt: str, schema: Dict[str, Any], brackets: str = '{}') -> str:
+        """Run one schema-constrained generation on the shared client, or a short-lived one if none was given."""
+        url = "http://localhost:11434/api/generate"
+        
+        data = {
+            "model": "llama2",
+            "prompt": prompt,
+            "format": schema,
+            "stream": True
+        }
+        
+        if self.client is not None:
+            return await self._stream_response(self.client, url, data, brackets)
+        async with httpx.AsyncClient(timeout=LLM_TIMEOUT) as client:
+            return await self._stream_response(client, url, data, brackets)
+            
+    async def _stream_response(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        data: Dict[str, Any],
+        brackets: str = '{}'
+    ) -> str:
+        """
+        Collect a streamed generation until the first top-level JSON value closes.
+        Leaving the stream early closes the connection, which stops Ollama generating.
+        """
+        opening, closing = brackets
+        parts = []
+        offset = 0  # Characters received before the current piece
+        start = end = None  # Span of the first top-level value in the joined text
+        depth = 0
+        in_string = escaped = False  # Brackets inside JSON strings don't count
+        async with client.stream("POST", url, json=data) as response:
+            if response.status_code != 200:
+                raise LLMResponseError(f"LLM API error: {response.status_code}")
+                
+            # Closed explicitly so leaving the loop early doesn't leave the generator suspended
+            chunks = _iter_ndjson(response)
+            try:
+                async for chunk in chunks:
+                    piece = chunk.get('response', '')
+                    parts.append(piece)
+                    
+                    i = 0
+                    if start is None:
+                        i = piece.find(opening)
+                        if i >= 0:
+                            start = offset + i
+                    if start is not None:
+                        for j in range(i, len(piece)):
+                            ch = piece[j]
+                            if in_string:
+                                if escaped:
+                                    escaped = False
+                                elif ch == '\\':
+                                    escaped = True
+                                elif ch == '"':
+                                    in_string = False
+                            elif ch == '"':
+                                in_string = True
+                            elif ch == opening:
+                                depth += 1
+                            elif ch == closing:
+                                depth -= 1
+                                if depth == 0:
+                                    end = offset + j + 1
+                                    break
+                    offset += len(piece)
+                    
+                    if end is not None or chunk.get('done'):
+                        break
+            finally:
+                await chunks.aclose()
+                
+        text = ''.join(parts)
+        if start is None:
+            return text.strip()
+        # Drop any prose around the value, e.g. "Sure! {...}"
+        return text[start:end]
+        
     def _format_market_data(self, market_data: Dict[str, pd.DataFrame]) -> str:
         """Format market data into a simple string for the prompt."""
-        summary = []
+        tickers, closes, volumes = [], [], []
         for ticker, data in market_data.items():
-            if not data.empty:
-                latest = data.iloc[-1]
-                previous = data.iloc[-2]
-                pct_change = ((latest['Close'] / previous['Close']) - 1) * 100
-                
-                summary.append(f"{ticker} Latest Data:")
-                summary.append(f"Close: ${latest['Close']:.2f}")
-                summary.append(f"Change: {pct_change:.2f}%")
-                summary.append(f"Volume: {latest['Volume']:,.0f}")
-                summary.append("---")
+            if len(data) < 2:
+                continue
+            # One 2-D array per ticker; iloc rows would build a Series per lookup
+            arr = data[['Close', 'Volume']].to_numpy(dtype=np.float64)
+            tickers.append(ticker)
+            closes.append(arr[-2:, 0])
+            volumes.append(arr[-1, 1])
+            
+        if not tickers:
+            return ""
+            
+        # One kernel call over every ticker's last two closes
+        closes = np.stack(closes)
+        pct_changes = fast_stats.pct_changes(closes)
+        
+        summary = [
+            f"{ticker} Latest Data:\n"
+            f"Close: ${close:.2f}\n"
+            f"Change: {pct_change:.2f}%\n"
+            f"Volume: {volume:,.0f}\n"
+            "---"
+            for ticker, close, pct_change, volume in zip(tickers, closes[:, -1], pct_changes, volumes)
+        ]
         
         return "\n".join(summary)
 
@@ -267,12 +540,16 @@ def save_trading_decisions(decisions: List[Dict[str, Any]]):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = f"trading_decisions_{timestamp}.json"
     
-    with open(output_file, 'w') as f:
-        json.dump(decisions, indent=2, fp=f)
+    Path(output_file).write_bytes(
+        orjson.dumps(decisions, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    )
     
     print(f"\nTrading decisions saved to: {output_file}")
 
 def main():
+    asyncio.run(_test_personas())
+
+async def _test_personas():
     # Get all txt files from the prompts directory
     prompts_dir = Path("prompts")
     persona_files = list(prompts_dir.glob("*.txt"))
@@ -283,39 +560,42 @@ def main():
         
     all_decisions = []
     
-    # Test each persona
-    for persona_file in persona_files:
-        print(f"\nTesting trader with persona: {persona_file.name}")
-        trader = SophisticatedTrader(persona_file.name)
-        
-        try:
-            # Get data request
-            print("Requesting data selection from trader...")
-            data_request = trader.request_data()
-            print("\nTrader's data request:")
-            print(json.dumps(data_request, indent=2))
-            
-            # Create sample market data for requested tickers
-            requested_tickers = data_request["tickers"]
-            sample_data = {}
+    # One pooled client for the whole run so both calls per persona reuse the
+    # same keep-alive connection to Ollama
+    async with httpx.AsyncClient(timeout=LLM_TIMEOUT) as client:
+        # Test each persona
+        for persona_file in persona_files:
+            print(f"\nTesting trader with persona: {persona_file.name}")
+            trader = SophisticatedTrader(persona_file, client=client)
             
-            for ticker in requested_tickers:
-                sample_data[ticker] = pd.DataFrame({
-                    'Close': [100.0 + i for i in range(3)],  # Different values for each ticker
-                    'Volume': [1000000 * (i+1) for i in range(3)]
-                })
-            
-            # Get trading decision
-            print("\nRequesting trading decision...")
-            decision = trader.analyze_and_trade(sample_data, requested_tickers)
-            print("\nTrader's decision:")
-            print(json.dumps(decision, indent=2))
-            
-            all_decisions.append(decision)
-            
-        except Exception as e:
-            print(f"Error processing persona {persona_file.name}: {str(e)}")
-            continue
+            try:
+                # Get data request
+                print("Requesting data selection from trader...")
+                data_request = await trader.request_data()
+                print("\nTrader's data request:")
+                print(json.dumps(data_request, indent=2))
+                
+                # Create sample market data for requested tickers
+                requested_tickers = data_request["tickers"]
+                sample_data = {}
+                
+                for ticker in requested_tickers:
+                    sample_data[ticker] = pd.DataFrame({
+                        'Close': [100.0 + i for i in range(3)],  # Different values for each ticker
+                        'Volume': [1000000 * (i+1) for i in range(3)]
+                    })
+                
+                # Get trading decision
+                print("\nRequesting trading decision...")
+                decision = await trader.analyze_and_trade(sample_data, requested_tickers)
+                print("\nTrader's decision:")
+                print(json.dumps(decision, indent=2))
+                
+                all_decisions.append(decision)
+                
+            except Exception as e:
+                print(f"Error processing persona {persona_file.name}: {str(e)}")
+                continue
     
     # Save all trading decisions
     if all_decisions:
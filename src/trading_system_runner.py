@@ -1,30 +1,47 @@
 from pathlib import Path
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from zoneinfo import ZoneInfo
+from typing import Dict, Any, List, Union
 import json
+import httpx
+import orjson
 import pandas as pd
 import webbrowser
 import os
 
 # Update imports to use correct package structure
-from src.sophisticated_trader_agent import SophisticatedTrader
+from src.sophisticated_trader_agent import SophisticatedTrader, LLM_TIMEOUT
 from src.market_data_collection_system import MarketDataCollector
 from src.enhanced_algo_test import BacktestFramework
 from src.utilities.json_to_html import convert_json_to_html
 
+# Columns every ticker frame must carry; MarketDataCollector flags frames it
+# has already checked with attrs['schema_ok']
+_SCHEMA = ('Datetime', 'Open', 'High', 'Low', 'Close', 'Volume')
+_FIELDS = _SCHEMA[1:]  # Per-ticker columns of the panel; Datetime becomes its index
+MIN_ROWS = 10  # Minimum bars per ticker in a sliced period
+MARKET_TZ = ZoneInfo('America/New_York')  # Naive dates are taken as market time
+
 class TradingSystemRunner:
     def __init__(
         self,
         data_dir: str = "market_data",
         prompts_dir: str = "prompts",
         results_dir: str = "backtest_results",
-        reference_date: datetime = None
+        reference_date: datetime = None,
+        max_concurrency: int = 4
     ):
         self.data_dir = Path(data_dir)
         self.prompts_dir = Path(prompts_dir)
         self.results_dir = Path(results_dir)
-        self.reference_date = reference_date or datetime.now()
+        self.reference_date = reference_date or datetime.now(MARKET_TZ)
+        if self.reference_date.tzinfo is None:
+            # Market data is timezone-aware, so naive dates can't be compared with it
+            self.reference_date = self.reference_date.replace(tzinfo=MARKET_TZ)
+        self.max_concurrency = max_concurrency  # Personas in flight against the LLM at once
         
         # Ensure directories exist
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -49,14 +66,52 @@ class TradingSystemRunner:
             reference_date=self.reference_date
         )
         
+    @staticmethod
+    def _time_indexed(df: pd.DataFrame) -> pd.DataFrame:
+        """Index a ticker's frame by its timezone-aware Datetime column (no-op once done)."""
+        if isinstance(df.index, pd.DatetimeIndex):
+            return df
+            
+        index = pd.DatetimeIndex(df['Datetime']).rename(None)
+        if index.tz is None:
+            index = index.tz_localize('America/New_York', nonexistent='shift_forward', ambiguous='NaT')
+            df = df.assign(Datetime=index)
+        df = df.set_index(index)
+        df = df[df.index.notna() & ~df.index.duplicated(keep='last')]
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df
+        
+    def _build_panel(self, market_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Combine per-ticker frames into one wide frame: a shared DatetimeIndex
+        and (ticker, field) columns, so a period is sliced once for all tickers.
+        """
+        frames = {}
+        for ticker, df in market_data.items():
+            if df.empty:
+                continue
+                
+            # Ensure required columns exist, unless checked at load time
+            if not df.attrs.get('schema_ok'):
+                missing_cols = [col for col in _SCHEMA if col not in df.columns]
+                if missing_cols:
+                    raise ValueError(f"Missing required columns for {ticker}: {missing_cols}")
+                    
+            frames[ticker] = self._time_indexed(df)[list(_FIELDS)]
+            
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1, sort=True)
+        
     def _slice_market_data(
         self,
-        market_data: Dict[str, pd.DataFrame],
+        market_data: Union[Dict[str, pd.DataFrame], pd.DataFrame],
         start_date: datetime,
         end_date: datetime
     ) -> Dict[str, pd.DataFrame]:
-        """Slice market data for a specific time period with validation."""
-        if not market_data:
+        """Slice market data (per-ticker frames or a _build_panel panel) for a specific time period with validation."""
+        if market_data is None or len(market_data) == 0:
             raise ValueError("No market data provided")
             
         if not isinstance(start_date, datetime) or not isinstance(end_date, datetime):
@@ -65,50 +120,59 @@ class TradingSystemRunner:
         if end_date <= start_date:
             raise ValueError("end_date must be after start_date")
             
-        sliced_data = {}
-        
-        for ticker, df in market_data.items():
-            if df.empty:
-                continue
-                
-            # Ensure required columns exist
-            required_cols = ['Datetime', 'Open', 'High', 'Low', 'Close', 'Volume']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                raise ValueError(f"Missing required columns for {ticker}: {missing_cols}")
-                
-            # Convert DataFrame datetime to timezone-aware if it isn't already
-            if df['Datetime'].dt.tz is None:
-                df['Datetime'] = df['Datetime'].dt.tz_localize('America/New_York')
-                
-            # Check for sufficient data
-            mask = (df['Datetime'] >= start_date) & (df['Datetime'] < end_date)
-            filtered_df = df[mask].copy()
+        panel = market_data
+        if not isinstance(panel, pd.DataFrame):
+            panel = self._build_panel(market_data)
+        if panel.empty:
+            raise ValueError("No valid data after filtering")
             
-            if len(filtered_df) < 10:  # Minimum data requirement
-                print(f"Warning: Insufficient data points for {ticker}")
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        if panel.index.tz is not None:
+            # Naive bounds (e.g. the datetime.now() default) are taken as market time
+            if start.tz is None:
+                start = start.tz_localize(panel.index.tz, nonexistent='shift_forward', ambiguous=True)
+            if end.tz is None:
+                end = end.tz_localize(panel.index.tz, nonexistent='shift_forward', ambiguous=True)
+                
+        # One binary search on the shared DatetimeIndex; end_date is exclusive
+        window = panel.loc[start:end - pd.Timedelta(1, 'ns')]
+        
+        # Check for sufficient data, counting every ticker's bars in one pass
+        counts = window.xs('Close', axis=1, level=1).count()
+        
+        sliced_data = {}
+        for ticker, count in counts.items():
+            if count < MIN_ROWS:
+                self.logger.warning("Insufficient data points for %s", ticker)
                 continue
                 
-            sliced_data[ticker] = filtered_df
+            # Drop the rows that only exist because other tickers traded then
+            sliced_data[ticker] = window[ticker].dropna(how='all')
             
         if not sliced_data:
             raise ValueError("No valid data after filtering")
             
         return sliced_data
 
-    def _test_single_persona(
+    async def _test_single_persona(
         self,
         persona_file: Path,
         decision_data: Dict[str, pd.DataFrame],
-        validation_data: Dict[str, pd.DataFrame]
+        validation_data: Dict[str, pd.DataFrame],
+        client: httpx.AsyncClient = None,
+        executor: ThreadPoolExecutor = None,
+        trader: SophisticatedTrader = None,
+        data_request: Dict[str, Any] = None
     ) -> Dict[str, Any]:
-        """Test a single trading persona with historical data."""
-        trader = SophisticatedTrader(str(persona_file.name))
+        """Test a single trading persona with historical data (and its data request, if already made)."""
+        if trader is None:
+            trader = SophisticatedTrader(persona_file, client=client)
         
         try:
             # Get data request from trader
-            self.logger.info(f"Getting data request for {persona_file.name}")
-            data_request = trader.request_data()
+            if data_request is None:
+                self.logger.info("Getting data request for %s", persona_file.name)
+                data_request = await trader.request_data()
             requested_tickers = [
                 ticker for ticker in data_request["tickers"]
                 if ticker in decision_data
@@ -118,34 +182,57 @@ class TradingSystemRunner:
                 raise ValueError("No requested tickers found in historical data")
             
             # Get trading decision based on decision period data
-            self.logger.info(f"Getting trading decision for {persona_file.name}")
-            decision = trader.analyze_and_trade(decision_data, requested_tickers)
+            self.logger.info("Getting trading decision for %s", persona_file.name)
+            decision = await trader.analyze_and_trade(decision_data, requested_tickers)
             decision['persona'] = persona_file.stem  # Add persona name to decision
-            self.logger.info(f"Got trading decision: {decision}")
+            self.logger.info("Got trading decision: %s", decision)
             
-            agent_responses = [decision]
-            
-            # Run backtest using validation period data
-            self.logger.info(f"Running backtest for {persona_file.name}")
-            metrics, trades = self.backtest_framework.run_backtest(
-                market_data=validation_data,
-                agent_responses=agent_responses
+            # Backtest and report writing block, so run them on a worker thread
+            # to keep the event loop free for other personas' LLM calls
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                executor,
+                self._backtest_decision,
+                persona_file,
+                decision,
+                validation_data
             )
-            
-            # Generate report
-            self.logger.info(f"Generating report for {persona_file.name}")
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_dir = self.results_dir / f"{persona_file.stem}_{timestamp}"
-            report = self.backtest_framework.generate_report(str(report_dir))
-            
-            result = json.loads(report)
-            self.logger.info(f"Test results for {persona_file.name}: {result}")
+            self.logger.info("Test results for %s: %s", persona_file.name, result)
             return result
             
         except Exception as e:
-            self.logger.error(f"Error in _test_single_persona for {persona_file.name}: {str(e)}")
+            self.logger.error("Error in _test_single_persona for %s: %s", persona_file.name, e)
             raise
 
+    def _backtest_decision(
+        self,
+        persona_file: Path,
+        decision: Dict[str, Any],
+        validation_data: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Any]:
+        """Backtest one persona's decision and write its report (runs on a worker thread)."""
+        # Each persona gets its own framework; run_backtest resets per-instance state
+        backtest_framework = BacktestFramework(
+            transaction_fee_pct=self.backtest_framework.fee_pct,
+            data_dir=str(self.data_dir),
+            reference_date=self.reference_date
+        )
+        
+        # Run backtest using validation period data
+        self.logger.info("Running backtest for %s", persona_file.name)
+        metrics, trades = backtest_framework.run_backtest(
+            market_data=validation_data,
+            agent_responses=[decision]
+        )
+        
+        # Generate report
+        self.logger.info("Generating report for %s", persona_file.name)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_dir = self.results_dir / f"{persona_file.stem}_{timestamp}"
+        report = backtest_framework.generate_report(str(report_dir))
+        
+        return json.loads(report)
+
     def _save_consolidated_results(self, all_results: Dict[str, Any]) -> str:
         """Save consolidated results from all personas and return the HTML report path."""
         if not all_results:
@@ -180,16 +267,18 @@ class TradingSystemRunner:
         if comparison:
             # Save comparison report
             comparison_file = self.results_dir / f"persona_comparison_{timestamp}.json"
-            with open(comparison_file, 'w') as f:
-                json.dump(comparison, indent=2, fp=f)
-            self.logger.info(f"Saved comparison to {comparison_file}")
+            comparison_file.write_bytes(orjson.dumps(
+                comparison, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
+            self.logger.info("Saved comparison to %s", comparison_file)
         
         if trades_list:
             # Save trades
             trades_file = self.results_dir / f"trading_decisions_{timestamp}.json"
-            with open(trades_file, 'w') as f:
-                json.dump(trades_list, indent=2, fp=f)
-            self.logger.info(f"Saved trades to {trades_file}")
+            trades_file.write_bytes(orjson.dumps(
+                trades_list, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
+            self.logger.info("Saved trades to %s", trades_file)
             
             # Generate HTML report
             try:
@@ -197,20 +286,75 @@ class TradingSystemRunner:
                     str(trades_file),
                     str(self.results_dir / "html_reports")
                 )
-                self.logger.info(f"HTML report generated at: {html_report_path}")
+                self.logger.info("HTML report generated at: %s", html_report_path)
                 return html_report_path
             except Exception as e:
-                self.logger.error(f"Error generating HTML report: {str(e)}")
+                self.logger.error("Error generating HTML report: %s", e)
                 
         return None
 
+    async def _test_all_personas(
+        self,
+        persona_files: List[Path],
+        decision_data: Dict[str, pd.DataFrame],
+        validation_data: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Any]:
+        """Run every persona through _test_single_persona, at most max_concurrency at a time."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            async with httpx.AsyncClient(timeout=LLM_TIMEOUT) as client:
+                traders = {}
+                for persona_file in persona_files:
+                    try:
+                        traders[persona_file] = SophisticatedTrader(persona_file, client=client)
+                    except FileNotFoundError as e:
+                        self.logger.error("Error testing persona %s: %s", persona_file.name, e)
+                        
+                # Every persona's data request goes to the LLM as one batched prompt
+                self.logger.info("Getting data requests for %d personas", len(traders))
+                data_requests = dict(zip(
+                    traders,
+                    await SophisticatedTrader.request_data_batch(list(traders.values()), semaphore)
+                ))
+                
+                async def test_persona(persona_file: Path) -> Dict[str, Any]:
+                    if isinstance(data_requests[persona_file], Exception):
+                        raise data_requests[persona_file]
+                    async with semaphore:
+                        self.logger.info("Testing persona: %s", persona_file.name)
+                        return await self._test_single_persona(
+                            persona_file,
+                            decision_data,
+                            validation_data,
+                            client,
+                            executor,
+                            trader=traders[persona_file],
+                            data_request=data_requests[persona_file]
+                        )
+                        
+                outcomes = await asyncio.gather(
+                    *(test_persona(persona_file) for persona_file in traders),
+                    return_exceptions=True
+                )
+        
+        # Test results for each persona
+        all_results = {}
+        for persona_file, outcome in zip(traders, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error("Error testing persona %s: %s", persona_file.name, outcome)
+                continue
+            all_results[persona_file.stem] = outcome
+            
+        return all_results
+
     def run_historical_test(
         self,
         lookback_days: int = 14,
         forward_days: int = 7
     ) -> Dict[str, Any]:
         """Run system test using historical data from reference date."""
-        self.logger.info(f"Starting historical test for reference date: {self.reference_date}")
+        self.logger.info("Starting historical test for reference date: %s", self.reference_date)
         
         # Calculate test period dates
         data_start = self.reference_date - timedelta(days=lookback_days)
@@ -229,35 +373,31 @@ class TradingSystemRunner:
         if not persona_files:
             raise ValueError("No persona files found in prompts directory!")
         
-        # Test results for each persona
-        all_results = {}
+        # Split data into decision and validation periods once; every persona
+        # sees the same slices, so they are shared read-only across tasks
+        try:
+            panel = self._build_panel(market_data)
+            decision_data = self._slice_market_data(
+                panel,
+                data_start,
+                self.reference_date
+            )
+            
+            validation_data = self._slice_market_data(
+                panel,
+                self.reference_date,
+                data_end
+            )
+        except ValueError as e:
+            self.logger.error("Error preparing market data for personas: %s", e)
+            decision_data = validation_data = None
         
-        for persona_file in persona_files:
-            self.logger.info(f"Testing persona: {persona_file.name}")
-            try:
-                # Split data into decision and validation periods
-                decision_data = self._slice_market_data(
-                    market_data,
-                    data_start,
-                    self.reference_date
-                )
-                
-                validation_data = self._slice_market_data(
-                    market_data,
-                    self.reference_date,
-                    data_end
-                )
-                
-                results = self._test_single_persona(
-                    persona_file,
-                    decision_data,
-                    validation_data
-                )
-                all_results[persona_file.stem] = results
-                
-            except Exception as e:
-                self.logger.error(f"Error testing persona {persona_file.name}: {str(e)}")
-                continue
+        # Test all personas concurrently; each one mostly waits on the LLM
+        all_results = {}
+        if decision_data is not None:
+            all_results = asyncio.run(
+                self._test_all_personas(persona_files, decision_data, validation_data)
+            )
         
         # Save consolidated results and get HTML report path
         html_report_path = self._save_consolidated_results(all_results)
@@ -267,19 +407,16 @@ class TradingSystemRunner:
             try:
                 abs_path = os.path.abspath(html_report_path)
                 url_path = f'file:///{abs_path.replace(os.sep, "/")}'
-                self.logger.info(f"Opening dashboard at {url_path}")
+                self.logger.info("Opening dashboard at %s", url_path)
                 webbrowser.open(url_path)
             except Exception as e:
-                self.logger.error(f"Error opening dashboard: {str(e)}")
+                self.logger.error("Error opening dashboard: %s", e)
         
         return all_results
 
 def main():
-    import pytz
-    
     # Set reference date with timezone (January 14, 2025)
-    ny_tz = pytz.timezone('America/New_York')
-    reference_date = ny_tz.localize(datetime(2025, 1, 14))
+    reference_date = datetime(2025, 1, 14, tzinfo=MARKET_TZ)
     
     # Configuration
     config = {
@@ -318,7 +455,7 @@ def main():
             print(f"Max Gain: {metrics.get('max_gain', 0)}%")
             
     except Exception as e:
-        logging.error(f"Error running historical test: {str(e)}", exc_info=True)
+        logging.error("Error running historical test: %s", e, exc_info=True)
         raise
 
 if __name__ == "__main__":
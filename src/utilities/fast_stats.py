@@ -0,0 +1,30 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional: compiled kernels, NumPy is used otherwise
+    njit = None
+
+def _pct_changes_numpy(closes_2d: np.ndarray) -> np.ndarray:
+    return (closes_2d[:, -1] / closes_2d[:, -2] - 1.0) * 100.0
+
+if njit is not None:
+    # Serial and compiled on first call: a few hundred tickers don't repay a
+    # thread pool, and importing the trader shouldn't pay for a JIT compile
+    @njit(cache=True)
+    def _pct_changes_numba(closes_2d):
+        n_tickers, n_rows = closes_2d.shape
+        out = np.empty(n_tickers, dtype=np.float64)
+        for i in range(n_tickers):
+            out[i] = (closes_2d[i, n_rows - 1] / closes_2d[i, n_rows - 2] - 1.0) * 100.0
+        return out
+
+def pct_changes(closes_2d: np.ndarray) -> np.ndarray:
+    """
+    Latest bar-to-bar percentage change for each row of a (n_tickers, n_rows) Close array.
+    Rows must be right-aligned: only the last two columns are used.
+    """
+    closes_2d = np.ascontiguousarray(closes_2d, dtype=np.float64)
+    if njit is not None:
+        return _pct_changes_numba(closes_2d)
+    return _pct_changes_numpy(closes_2d)
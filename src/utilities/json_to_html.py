@@ -1,43 +1,50 @@
+import io
 import json
+from array import array
 from pathlib import Path
+import shutil
 import sys
-from datetime import datetime
-from typing import Dict, List, Any
+import tempfile
+import time
+from collections import ChainMap, Counter
+from typing import BinaryIO, Dict, Final, Iterable, Iterator, List, Any, Optional
 
-def calculate_metrics(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate summary metrics from trading results."""
-    metrics = {
-        'total_trades': len(trades),
-        'directions': {},
-        'tickers': {},
-        'avg_pnl': 0,
-        'total_pnl': 0
-    }
-    
-    for trade in trades:
-        # Count directions
-        direction = trade['direction']
-        metrics['directions'][direction] = metrics['directions'].get(direction, 0) + 1
-        
-        # Count tickers
-        ticker = trade['ticker']
-        metrics['tickers'][ticker] = metrics['tickers'].get(ticker, 0) + 1
-        
-        # Calculate averages and totals
-        if 'pnl' in trade:
-            metrics['total_pnl'] += trade['pnl']
-            metrics['avg_pnl'] = metrics['total_pnl'] / metrics['total_trades']
-    
-    return metrics
+try:
+    import ijson
+except ImportError:  # optional: incremental parsing, the whole file is parsed otherwise
+    ijson = None
 
-def create_html_report(json_file: str) -> str:
-    """Convert trading results JSON to HTML report."""
-    with open(json_file, 'r') as f:
-        trades = json.load(f)
-    
-    metrics = calculate_metrics(trades)
-    
-    css = """
+try:
+    import orjson
+except ImportError:  # optional: native JSON parsing, stdlib json is used otherwise
+    orjson = None
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # optional: compiled PnL total, the built-in sum is used otherwise
+    njit = None
+
+if njit is not None:
+    # Compiled on the first report rather than at import
+    @njit(cache=True)
+    def _total_numba(values):
+        total = 0.0
+        for i in range(values.shape[0]):
+            total += values[i]
+        return total
+
+def _total(values: array) -> float:
+    """Sum of an array('d') buffer, in order, like a running total."""
+    if njit is not None:
+        return float(_total_numba(np.frombuffer(values, dtype=np.float64)))
+    return sum(values)
+
+# Trade rows beyond this many bytes are buffered on disk rather than in memory
+ROW_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Fixed page fragments, built once at import
+_CSS: Final[str] = """
     <style>
         body { 
             font-family: Arial, sans-serif; 
@@ -125,8 +132,8 @@ def create_html_report(json_file: str) -> str:
         }
     </style>
     """
-    
-    html = f"""
+
+_REPORT_HEAD_TMPL: Final[str] = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -139,7 +146,7 @@ def create_html_report(json_file: str) -> str:
         <div class="container">
             <div class="header">
                 <h1>Trading Results Report</h1>
-                <div class="timestamp">Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
+                <div class="timestamp">Generated on {timestamp}</div>
             </div>
 
             <div class="metrics">
@@ -147,15 +154,15 @@ def create_html_report(json_file: str) -> str:
                 <div class="metrics-grid">
                     <div class="metric-card">
                         <div class="metric-title">Total Trades</div>
-                        <div class="metric-value">{metrics['total_trades']}</div>
+                        <div class="metric-value">{total_trades}</div>
                     </div>
                     <div class="metric-card">
                         <div class="metric-title">Total PnL</div>
-                        <div class="metric-value">${metrics['total_pnl']:.2f}</div>
+                        <div class="metric-value">${total_pnl:.2f}</div>
                     </div>
                     <div class="metric-card">
                         <div class="metric-title">Average PnL per Trade</div>
-                        <div class="metric-value">${metrics['avg_pnl']:.2f}</div>
+                        <div class="metric-value">${avg_pnl:.2f}</div>
                     </div>
                 </div>
 
@@ -167,19 +174,8 @@ def create_html_report(json_file: str) -> str:
                         <th>Percentage</th>
                     </tr>
     """
-    
-    # Add direction breakdown
-    for direction, count in metrics['directions'].items():
-        percentage = (count / metrics['total_trades']) * 100
-        html += f"""
-                    <tr>
-                        <td>{direction}</td>
-                        <td>{count}</td>
-                        <td>{percentage:.1f}%</td>
-                    </tr>
-        """
-    
-    html += """
+
+_TABLE_HEADER: Final[str] = """
                 </table>
             </div>
 
@@ -197,32 +193,141 @@ def create_html_report(json_file: str) -> str:
                     <th>Exit Reason</th>
                 </tr>
     """
-    
-    # Add individual trades
-    for trade in trades:
-        direction_class = trade['direction'].lower()
-        html += f"""
-                <tr class="{direction_class}">
-                    <td>{trade['direction']}</td>
-                    <td>{trade['ticker']}</td>
-                    <td>{trade['position_size']}</td>
-                    <td>${trade['entry_price']:.2f}</td>
-                    <td>${trade['exit_price']:.2f}</td>
-                    <td>${trade['pnl']:.2f}</td>
-                    <td>{trade['pnl_pct']:.2f}%</td>
-                    <td>{trade['agent']}</td>
-                    <td>{trade['exit_reason']}</td>
-                </tr>
-        """
-    
-    html += """
+
+_TABLE_FOOTER: Final[str] = """
             </table>
         </div>
     </body>
     </html>
     """
+
+# Per-row templates, filled with str.format_map rather than one f-string per row
+_DIRECTION_ROW_TMPL: Final[str] = """
+                    <tr>
+                        <td>{direction}</td>
+                        <td>{count}</td>
+                        <td>{percentage:.1f}%</td>
+                    </tr>
+        """
+
+# `c` is the row's CSS class, the lower-cased direction
+_ROW_TMPL: Final[str] = """
+                <tr class="{c}">
+                    <td>{direction}</td>
+                    <td>{ticker}</td>
+                    <td>{position_size}</td>
+                    <td>${entry_price:.2f}</td>
+                    <td>${exit_price:.2f}</td>
+                    <td>${pnl:.2f}</td>
+                    <td>{pnl_pct:.2f}%</td>
+                    <td>{agent}</td>
+                    <td>{exit_reason}</td>
+                </tr>
+        """
+
+# Row CSS class for the usual directions, so each row is a lookup rather than a lower()
+_DIR_CLASS: Final[Dict[str, str]] = {
+    'LONG': 'long', 'SHORT': 'short', 'BUY': 'buy', 'SELL': 'sell'
+}
+
+class MetricsAccumulator:
+    """Summary metrics built up one trade at a time."""
+    
+    def __init__(self):
+        self.total_trades = 0
+        self.directions = Counter()
+        self.tickers = Counter()
+        self.pnls = array('d')  # Compact float64 buffer, summed once in finalize()
+        
+    def update(self, trade: Dict[str, Any]) -> None:
+        """Add one trade to the running counts and totals."""
+        self.add(trade['direction'], trade['ticker'], trade.get('pnl'))
+        
+    def add(self, direction: str, ticker: str, pnl: Optional[float]) -> None:
+        """Add one trade from fields the caller has already looked up."""
+        self.total_trades += 1
+        self.directions[direction] += 1
+        self.tickers[ticker] += 1
+        if pnl is not None:
+            self.pnls.append(pnl)
+            
+    def finalize(self) -> Dict[str, Any]:
+        """Metrics for every trade seen so far."""
+        total_pnl = _total(self.pnls)
+        return {
+            'total_trades': self.total_trades,
+            'directions': dict(self.directions),
+            'tickers': dict(self.tickers),
+            'avg_pnl': total_pnl / self.total_trades if self.total_trades else 0,
+            'total_pnl': total_pnl
+        }
+
+def calculate_metrics(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculate summary metrics from trading results."""
+    accumulator = MetricsAccumulator()
+    for trade in trades:
+        accumulator.update(trade)
+    return accumulator.finalize()
+
+def iter_trades(json_file: str) -> Iterator[Dict[str, Any]]:
+    """Yield the trades of a results JSON file one at a time, without loading the whole list."""
+    with open(json_file, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'item', use_float=True)
+        elif orjson is not None:
+            yield from orjson.loads(f.read())
+        else:
+            yield from json.load(f)
+
+def write_html_report(trades: Iterable[Dict[str, Any]], out: BinaryIO) -> None:
+    """
+    Write an HTML report for a stream of trades to a binary file object.
+    Trade rows are spooled (to disk past ROW_BUFFER_SIZE) while the metrics that
+    head the page accumulate, so memory use doesn't grow with the trade count.
+    """
+    metrics = MetricsAccumulator()
     
-    return html
+    # Single pass over the trades: metrics accumulate while trade rows are buffered
+    with tempfile.SpooledTemporaryFile(max_size=ROW_BUFFER_SIZE) as rows:
+        for trade in trades:
+            # One lookup per field, shared by the metrics and the row
+            direction = trade['direction']
+            ticker = trade['ticker']
+            pnl = trade['pnl']
+            metrics.add(direction, ticker, pnl)
+            row_class = _DIR_CLASS.get(direction) or direction.lower()
+            rows.write(_ROW_TMPL.format_map(ChainMap({'c': row_class}, trade)).encode('utf-8'))
+            
+        metrics = metrics.finalize()
+        
+        out.write(_REPORT_HEAD_TMPL.format(
+            css=_CSS,
+            timestamp=time.strftime('%Y-%m-%d %H:%M:%S'),
+            total_trades=metrics['total_trades'],
+            total_pnl=metrics['total_pnl'],
+            avg_pnl=metrics['avg_pnl']
+        ).encode('utf-8'))
+        
+        # Add direction breakdown
+        for direction, count in metrics['directions'].items():
+            percentage = (count / metrics['total_trades']) * 100
+            out.write(_DIRECTION_ROW_TMPL.format(
+                direction=direction, count=count, percentage=percentage
+            ).encode('utf-8'))
+            
+        out.write(_TABLE_HEADER.encode('utf-8'))
+        
+        # Add individual trades
+        rows.seek(0)
+        shutil.copyfileobj(rows, out)
+        
+    out.write(_TABLE_FOOTER.encode('utf-8'))
+
+def create_html_report(json_file: str) -> str:
+    """Convert trading results JSON to HTML report."""
+    out = io.BytesIO()
+    write_html_report(iter_trades(json_file), out)
+    return out.getvalue().decode('utf-8')
 
 def convert_json_to_html(json_path: str, output_dir: str = "reports") -> str:
     """Convert JSON file to HTML report and save it."""
@@ -230,17 +335,19 @@ def convert_json_to_html(json_path: str, output_dir: str = "reports") -> str:
         # Create output directory if it doesn't exist
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
-        # Generate HTML
-        html_content = create_html_report(json_path)
-        
         # Create output filename
         json_filename = Path(json_path).stem
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         output_path = Path(output_dir) / f"{json_filename}_report_{timestamp}.html"
         
-        # Save HTML file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Stream the report straight into the file
+        try:
+            with open(output_path, 'wb', buffering=1 << 20) as f:
+                write_html_report(iter_trades(json_path), f)
+        except BaseException:
+            # Don't leave a truncated report behind
+            output_path.unlink(missing_ok=True)
+            raise
             
         print(f"Report generated successfully: {output_path}")
         return str(output_path)
@@ -1,18 +1,46 @@
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import ClassVar, Dict, Any, FrozenSet, Iterable, List, Optional, Tuple
+from datetime import date
 import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional: native JSON parsing, stdlib json is used otherwise
+    orjson = None
+
+# Dates in LLM responses must be plain YYYY-MM-DD
+_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+# Fields every saved trading decision must carry
+_SAVED_DECISION_FIELDS = frozenset({'action', 'ticker', 'amount'})
+
+def _parse_date(value: str) -> date:
+    """Parse a YYYY-MM-DD date with the C-level ISO parser instead of strptime."""
+    if not _DATE_RE.fullmatch(value):
+        raise ValueError(f"time data {value!r} does not match format '%Y-%m-%d'")
+    return date.fromisoformat(value)
 
 class LLMResponseValidator:
     """Validates JSON responses from LLM trading agents."""
     
-    @staticmethod
-    def validate_data_request(response: Dict[str, Any], available_tickers: List[str]) -> Dict[str, Any]:
+    # Fields each response type must carry, built once with the class
+    _DATA_REQ_FIELDS: ClassVar[FrozenSet[str]] = frozenset({'tickers', 'timeframe'})
+    _TIMEFRAME_FIELDS: ClassVar[FrozenSet[str]] = frozenset({'start', 'end', 'resolution'})
+    _DECISION_FIELDS: ClassVar[FrozenSet[str]] = frozenset({
+        'action', 'ticker', 'amount', 'expected_timeframe',
+        'expected_profit_percentage'
+    })
+    _VALID_ACTIONS: ClassVar[FrozenSet[str]] = frozenset({'BUY', 'SELL', 'SHORT', 'PUT'})
+    _TF_SUFFIXES: ClassVar[Tuple[str, ...]] = ('d', 'w', 'm')
+    
+    @classmethod
+    def validate_data_request(cls, response: Dict[str, Any], available_tickers: Iterable[str]) -> Dict[str, Any]:
         """
         Validates data request format from LLM.
         
         Args:
             response: Dictionary containing LLM response
-            available_tickers: List of valid ticker symbols
+            available_tickers: Valid ticker symbols (ideally a set)
             
         Returns:
             Validated and cleaned response dictionary
@@ -24,10 +52,9 @@ class LLMResponseValidator:
         if not isinstance(response, dict):
             raise ValueError("Response must be a dictionary")
             
-        required_fields = ['tickers', 'timeframe']
-        missing_fields = [f for f in required_fields if f not in response]
+        missing_fields = cls._DATA_REQ_FIELDS - response.keys()
         if missing_fields:
-            raise ValueError(f"Missing required fields: {missing_fields}")
+            raise ValueError(f"Missing required fields: {sorted(missing_fields)}")
             
         # Validate tickers
         if not isinstance(response['tickers'], list):
@@ -36,6 +63,7 @@ class LLMResponseValidator:
         if not 2 <= len(response['tickers']) <= 5:
             raise ValueError("Must select between 2-5 tickers")
             
+        available_tickers = frozenset(available_tickers)
         invalid_tickers = [t for t in response['tickers'] if t not in available_tickers]
         if invalid_tickers:
             raise ValueError(f"Invalid tickers selected: {invalid_tickers}")
@@ -45,15 +73,14 @@ class LLMResponseValidator:
         if not isinstance(timeframe, dict):
             raise ValueError("'timeframe' must be a dictionary")
             
-        required_timeframe = ['start', 'end', 'resolution']
-        missing_timeframe = [f for f in required_timeframe if f not in timeframe]
+        missing_timeframe = cls._TIMEFRAME_FIELDS - timeframe.keys()
         if missing_timeframe:
-            raise ValueError(f"Missing timeframe fields: {missing_timeframe}")
+            raise ValueError(f"Missing timeframe fields: {sorted(missing_timeframe)}")
             
         # Validate dates
         try:
-            start_date = datetime.strptime(timeframe['start'], '%Y-%m-%d')
-            end_date = datetime.strptime(timeframe['end'], '%Y-%m-%d')
+            start_date = _parse_date(timeframe['start'])
+            end_date = _parse_date(timeframe['end'])
             if end_date <= start_date:
                 raise ValueError("End date must be after start date")
         except ValueError as e:
@@ -65,17 +92,18 @@ class LLMResponseValidator:
             
         return response
 
-    @staticmethod
+    @classmethod
     def validate_trading_decision(
+        cls,
         response: Dict[str, Any],
-        available_tickers: List[str]
+        available_tickers: Iterable[str]
     ) -> Dict[str, Any]:
         """
         Validates trading decision format from LLM.
         
         Args:
             response: Dictionary containing LLM response
-            available_tickers: List of valid ticker symbols
+            available_tickers: Valid ticker symbols (ideally a set)
             
         Returns:
             Validated and cleaned response dictionary
@@ -86,21 +114,16 @@ class LLMResponseValidator:
         if not isinstance(response, dict):
             raise ValueError("Response must be a dictionary")
             
-        required_fields = [
-            'action', 'ticker', 'amount', 'expected_timeframe',
-            'expected_profit_percentage'
-        ]
-        missing_fields = [f for f in required_fields if f not in response]
+        missing_fields = cls._DECISION_FIELDS - response.keys()
         if missing_fields:
-            raise ValueError(f"Missing required fields: {missing_fields}")
+            raise ValueError(f"Missing required fields: {sorted(missing_fields)}")
             
         # Validate action
-        valid_actions = ['BUY', 'SELL', 'SHORT', 'PUT']
-        if response['action'] not in valid_actions:
+        if response['action'] not in cls._VALID_ACTIONS:
             raise ValueError(f"Invalid action: {response['action']}")
             
         # Validate ticker
-        if response['ticker'] not in available_tickers:
+        if response['ticker'] not in frozenset(available_tickers):
             raise ValueError(f"Invalid ticker: {response['ticker']}")
             
         # Validate numeric fields
@@ -118,7 +141,7 @@ class LLMResponseValidator:
             
         # Validate timeframe format (e.g., "1d", "5d", etc.)
         if not isinstance(response['expected_timeframe'], str) or \
-           not response['expected_timeframe'].endswith(('d', 'w', 'm')):
+           not response['expected_timeframe'].endswith(cls._TF_SUFFIXES):
             raise ValueError("Invalid timeframe format")
             
             
@@ -135,18 +158,17 @@ def load_and_validate_trading_decisions(filepath: str) -> List[Dict[str, Any]]:
         List of validated trading decision dictionaries
     """
     try:
-        with open(filepath, 'r') as f:
-            decisions = json.load(f)
+        with open(filepath, 'rb') as f:
+            decisions = orjson.loads(f.read()) if orjson is not None else json.load(f)
             
         if not isinstance(decisions, list):
             raise ValueError("File must contain a list of trading decisions")
             
         # Basic structure validation
-        required_fields = ['action', 'ticker', 'amount']
         for decision in decisions:
-            missing_fields = [f for f in required_fields if f not in decision]
+            missing_fields = _SAVED_DECISION_FIELDS - decision.keys()
             if missing_fields:
-                raise ValueError(f"Decision missing required fields: {missing_fields}")
+                raise ValueError(f"Decision missing required fields: {sorted(missing_fields)}")
                 
         return decisions
         
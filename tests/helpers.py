@@ -0,0 +1,12 @@
+from typing import Any, Dict, Sequence
+
+def data_request(
+    tickers: Sequence[str] = ("AAPL", "MSFT"),
+    start: str = "2025-01-22",
+    end: str = "2025-02-05"
+) -> Dict[str, Any]:
+    """A data request as an LLM returns it: tickers plus an hourly timeframe"""
+    return {
+        "tickers": list(tickers),
+        "timeframe": {"start": start, "end": end, "resolution": "hourly"}
+    }
@@ -0,0 +1,31 @@
+import unittest
+from datetime import timedelta
+from pathlib import Path
+import sys
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.enhanced_algo_test import _parse_timeframe
+
+class TestParseTimeframe(unittest.TestCase):
+    def test_supported_units(self):
+        """Hour, day and week suffixes become the matching timedelta"""
+        self.assertEqual(_parse_timeframe("12h"), timedelta(hours=12))
+        self.assertEqual(_parse_timeframe("5d"), timedelta(days=5))
+        self.assertEqual(_parse_timeframe("2w"), timedelta(weeks=2))
+
+    def test_repeated_timeframe(self):
+        """A cached timeframe parses to the same value again"""
+        self.assertEqual(_parse_timeframe("3d"), _parse_timeframe("3d"))
+
+    def test_invalid_timeframes(self):
+        """Anything but <digits><h|d|w> is rejected"""
+        for timeframe in ["", "d", "5", "5m", "1.5d", "-2d", " 5d", "5d\n", "5 d", "5D"]:
+            with self.subTest(timeframe=timeframe):
+                with self.assertRaises(ValueError):
+                    _parse_timeframe(timeframe)
+
+if __name__ == '__main__':
+    unittest.main()
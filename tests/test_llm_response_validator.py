@@ -0,0 +1,34 @@
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.validators.llm_response_validator import LLMResponseValidator
+from tests.helpers import data_request
+
+TICKERS = {"AAPL", "MSFT"}
+
+class TestDataRequestDates(unittest.TestCase):
+    def test_valid_dates(self):
+        """Zero-padded YYYY-MM-DD dates in order are accepted"""
+        response = data_request(start="2025-01-22", end="2025-02-05")
+        self.assertIs(LLMResponseValidator.validate_data_request(response, TICKERS), response)
+
+    def test_malformed_dates(self):
+        """Dates that aren't strict, zero-padded YYYY-MM-DD are rejected"""
+        for start in ["2025-1-22", "2025-01-2", "25-01-22", "2025/01/22", "2025-01-22\n",
+                      " 2025-01-22", "2025-01-22T00:00", "2025-13-01", "2025-02-30", "２０２５-01-22"]:
+            with self.subTest(start=start):
+                with self.assertRaisesRegex(ValueError, "Invalid date format"):
+                    LLMResponseValidator.validate_data_request(data_request(start=start, end="2025-02-05"), TICKERS)
+
+    def test_end_before_start(self):
+        """The end date must come after the start date"""
+        with self.assertRaisesRegex(ValueError, "End date must be after start date"):
+            LLMResponseValidator.validate_data_request(data_request(start="2025-02-05", end="2025-02-05"), TICKERS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.market_data_collection_system import MarketDataCollector, DATA_COLUMNS
+from src.enhanced_algo_test import BacktestFramework
+
+class TestMarketDataCollection(unittest.TestCase):
+    def setUp(self):
+        """Write a small hourly dataset for two tickers into a temporary data folder"""
+        self.data_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_folder)
+        self.collector = MarketDataCollector(self.data_folder)
+
+        index = pd.date_range('2025-01-27 09:30', periods=48, freq='h', tz='America/New_York')
+        for offset, ticker in enumerate(["AAPL", "MSFT"]):
+            close = [100.0 + offset + i for i in range(len(index))]
+            self.collector._write_ticker_data(ticker, pd.DataFrame({
+                'Datetime': index,
+                'Open': close,
+                'High': [c + 1 for c in close],
+                'Low': [c - 1 for c in close],
+                'Close': close,
+                'Volume': 1000
+            }))
+        self.index = index
+
+    def test_parquet_round_trip(self):
+        """Data written to a ticker partition reads back unchanged"""
+        df = self.collector.load_ticker_data("AAPL")
+
+        self.assertEqual(list(df.columns), DATA_COLUMNS)
+        self.assertEqual(len(df), len(self.index))
+        self.assertTrue((df['Datetime'] == self.index).all())
+        self.assertEqual(df['Close'].iloc[-1], 100.0 + len(self.index) - 1)
+
+    def test_rewrite_invalidates_cache(self):
+        """Rewriting a partition makes the next load read the new rows"""
+        self.assertEqual(len(self.collector.load_ticker_data("AAPL")), len(self.index))
+
+        index = pd.date_range('2025-02-03 09:30', periods=60, freq='h', tz='America/New_York')
+        self.collector._write_ticker_data("AAPL", pd.DataFrame({
+            'Datetime': index, 'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 10
+        }))
+
+        df = self.collector.load_ticker_data("AAPL")
+        self.assertEqual(len(df), 60)
+        self.assertTrue((df['Datetime'] == index).all())
+        self.assertTrue((df['Close'] == 1.5).all())
+
+    def test_loaded_frame_is_a_copy(self):
+        """Changes to a loaded frame don't leak into the cached one"""
+        df = self.collector.load_ticker_data("AAPL")
+        df.loc[0, 'Close'] = -1.0
+        df['Extra'] = 1
+        df.drop(index=df.index[-5:], inplace=True)
+
+        again = self.collector.load_ticker_data("AAPL")
+        self.assertEqual(again.loc[0, 'Close'], 100.0)
+        self.assertEqual(list(again.columns), DATA_COLUMNS)
+        self.assertEqual(len(again), len(self.index))
+
+    def test_historical_data_window(self):
+        """Only rows inside the requested date range are returned"""
+        start = self.index[10].to_pydatetime()
+        end = self.index[20].to_pydatetime()
+        data = self.collector.get_historical_data(start, end)
+
+        self.assertEqual(sorted(data), ["AAPL", "MSFT"])
+        for ticker, df in data.items():
+            self.assertEqual(len(df), 11, f"Wrong number of rows for {ticker}")
+            self.assertEqual(df['Datetime'].min(), self.index[10])
+            self.assertEqual(df['Datetime'].max(), self.index[20])
+            self.assertTrue(df.attrs.get('schema_ok'))
+
+    def test_historical_data_outside_window(self):
+        """Tickers with no rows in the range are left out"""
+        data = self.collector.get_historical_data(datetime(2024, 1, 1), datetime(2024, 1, 31))
+        self.assertEqual(data, {})
+
+    def test_empty_partition_counts_as_missing(self):
+        """A ticker directory without Parquet files doesn't break the scan"""
+        os.makedirs(self.collector._ticker_dir("NVDA"))
+        start = self.index[0].to_pydatetime()
+        end = self.index[-1].to_pydatetime()
+
+        data = self.collector.get_historical_data(start, end)
+        self.assertEqual(sorted(data), ["AAPL", "MSFT"])
+
+        # Only empty partitions left
+        for ticker in ["AAPL", "MSFT"]:
+            shutil.rmtree(self.collector._ticker_dir(ticker))
+            os.makedirs(self.collector._ticker_dir(ticker))
+        self.assertEqual(self.collector.get_historical_data(start, end), {})
+
+    def test_empty_partition_skipped_by_loaders(self):
+        """Per-ticker loaders treat a partition without Parquet files as no data"""
+        os.makedirs(self.collector._ticker_dir("NVDA"))
+
+        self.assertTrue(self.collector.load_ticker_data("NVDA").empty)
+
+        data = self.collector.get_data_for_analysis(["AAPL", "NVDA"], "2025-01-27", "2025-01-30")
+        self.assertEqual(sorted(data), ["AAPL"])
+
+        framework = BacktestFramework(data_dir=self.data_folder)
+        prepared = framework.prepare_data(self.index[0], self.index[-1], ["AAPL", "NVDA"])
+        self.assertEqual(sorted(prepared), ["AAPL"])
+        self.assertEqual(len(prepared["AAPL"]), len(self.index))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import asyncio
+import json
+import shutil
+import tempfile
+import httpx
+from pathlib import Path
+import sys
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.sophisticated_trader_agent import SophisticatedTrader
+from tests.helpers import data_request
+
+class TestRequestDataBatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Three personas sharing a client whose LLM answers are scripted per test"""
+        self.prompts_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.prompts_dir)
+        for name in ["alpha", "beta", "gamma"]:
+            (Path(self.prompts_dir) / f"{name}.txt").write_text(f"You are {name}, a trader.")
+
+        self.batch_answer = []
+        self.batch_calls = 0
+        self.single_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+        self.addAsyncCleanup(self.client.aclose)
+        self.traders = [
+            SophisticatedTrader(f"{name}.txt", prompts_dir=self.prompts_dir, client=self.client)
+            for name in ["alpha", "beta", "gamma"]
+        ]
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer like Ollama's streaming API: batched prompts ask for a JSON array"""
+        body = json.loads(request.content)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        if body.get("format", {}).get("type") == "array":
+            self.batch_calls += 1
+            answer = self.batch_answer
+        else:
+            self.single_calls += 1
+            answer = data_request(["NVDA", "AMD"])
+        line = json.dumps({"response": json.dumps(answer), "done": True})
+        return httpx.Response(200, content=(line + "\n").encode())
+
+    async def test_valid_batch(self):
+        """A valid array answers every persona with one LLM call"""
+        self.batch_answer = [
+            data_request(["AAPL", "MSFT"]),
+            data_request(["GOOGL", "AMZN"]),
+            data_request(["META", "NVDA"])
+        ]
+        results = await SophisticatedTrader.request_data_batch(self.traders)
+
+        self.assertEqual(results, self.batch_answer)
+        self.assertEqual(self.batch_calls, 1)
+        self.assertEqual(self.single_calls, 0)
+
+    async def test_wrong_length_falls_back(self):
+        """An array of the wrong length sends every persona to request_data()"""
+        self.batch_answer = [data_request(["AAPL", "MSFT"])]
+        results = await SophisticatedTrader.request_data_batch(self.traders)
+
+        self.assertEqual(results, [data_request(["NVDA", "AMD"])] * 3)
+        self.assertEqual(self.batch_calls, 1)
+        self.assertEqual(self.single_calls, 3)
+
+    async def test_invalid_element_falls_back(self):
+        """Only the persona with an invalid entry is asked again"""
+        self.batch_answer = [
+            data_request(["AAPL", "MSFT"]),
+            data_request(["AAPL", "NOT_A_TICKER"]),
+            data_request(["META", "NVDA"])
+        ]
+        results = await SophisticatedTrader.request_data_batch(self.traders)
+
+        self.assertEqual(results, [
+            data_request(["AAPL", "MSFT"]),
+            data_request(["NVDA", "AMD"]),
+            data_request(["META", "NVDA"])
+        ])
+        self.assertEqual(self.single_calls, 1)
+
+    async def test_fallback_respects_semaphore(self):
+        """Fallback requests hold the caller's semaphore"""
+        self.batch_answer = []
+        await SophisticatedTrader.request_data_batch(self.traders, asyncio.Semaphore(1))
+
+        self.assertEqual(self.single_calls, 3)
+        self.assertEqual(self.max_in_flight, 1)
+
+class TestStreamResponse(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """A trader whose client streams scripted NDJSON chunks"""
+        prompts_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, prompts_dir)
+        (Path(prompts_dir) / "alpha.txt").write_text("You are alpha, a trader.")
+        self.trader = SophisticatedTrader("alpha.txt", prompts_dir=prompts_dir)
+
+    async def _stream(self, pieces, brackets='{}', done_after=None, trailer=True):
+        """
+        Stream `pieces` as Ollama response chunks, the last one (or the one at
+        index `done_after`) marked done. With `trailer`, a malformed line follows
+        that parsing would choke on, so reading past the value fails the test.
+        """
+        self.chunks_sent = 0
+
+        async def body():
+            for i, piece in enumerate(pieces):
+                done = i == (len(pieces) - 1 if done_after is None else done_after)
+                self.chunks_sent += 1
+                yield (json.dumps({"response": piece, "done": done}) + "\n").encode()
+            if trailer:
+                yield b"not json\n"
+
+        def handle(request):
+            return httpx.Response(200, content=body())
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+            return await self.trader._stream_response(client, "http://llm/api/generate", {}, brackets)
+
+    async def test_value_split_across_chunks(self):
+        """A value arriving a few characters at a time is reassembled"""
+        text = '{"action": "BUY", "nested": {"amount": [1, 2]}}'
+        for size in (1, 3, 7):
+            with self.subTest(size=size):
+                pieces = [text[i:i + size] for i in range(0, len(text), size)]
+                self.assertEqual(await self._stream(pieces + ['ignored'], trailer=False), text)
+
+    async def test_stops_when_value_closes(self):
+        """Chunks after the closing bracket are never read"""
+        result = await self._stream(['{"a": ', '{"b": 1}', '}', ' more', ' text'])
+
+        self.assertEqual(result, '{"a": {"b": 1}}')
+        self.assertEqual(self.chunks_sent, 3)
+
+    async def test_prose_around_value(self):
+        """Text before and after the value is dropped"""
+        result = await self._stream(['Sure! Here you go: ', '{"a": 1}', ' Hope it helps'])
+        self.assertEqual(result, '{"a": 1}')
+
+        result = await self._stream(['Sure! {"a"', ': 1} Hope', ' it helps'])
+        self.assertEqual(result, '{"a": 1}')
+
+    async def test_done_before_value_closes(self):
+        """A generation that ends mid-value returns what arrived from the opening bracket"""
+        result = await self._stream(['Sure! {"a": ', '[1, 2'], trailer=False)
+        self.assertEqual(result, '{"a": [1, 2')
+
+        result = await self._stream(['{"a": ', '1', '}'], done_after=1, trailer=False)
+        self.assertEqual(result, '{"a": 1')
+
+    async def test_no_value(self):
+        """Without any opening bracket the stripped text is returned"""
+        self.assertEqual(await self._stream([' no json ', 'here '], trailer=False), 'no json here')
+
+    async def test_array_mode(self):
+        """With '[]' brackets the first top-level array is returned"""
+        result = await self._stream(['Answers: [{"a": 1}', ', {"b": [2]}', '] done', ' now'], brackets='[]')
+        self.assertEqual(result, '[{"a": 1}, {"b": [2]}]')
+
+    async def test_brackets_inside_strings(self):
+        """Brackets and escaped quotes inside JSON strings don't affect the depth"""
+        text = '{"reason": "range [a", "note": "}{ \\"quoted }\\" \\\\", "x": 1}'
+        self.assertEqual(json.loads(text)["x"], 1)
+        self.assertEqual(await self._stream([text[:12], text[12:30], text[30:], ' tail']), text)
+
+        text = '[{"reason": "closing ] early"}, {"reason": "[unbalanced"}]'
+        self.assertEqual(await self._stream([text, ' tail'], brackets='[]'), text)
+
+if __name__ == '__main__':
+    unittest.main()
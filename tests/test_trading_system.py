@@ -11,6 +11,11 @@ sys.path.append(str(project_root))
 
 from src.trading_system_runner import TradingSystemRunner
 
+# Tickers loaded by the market data processing test
+_SAMPLE_TICKERS = (
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "PYPL", "INTC", "CSCO", "CMCSA", "ADBE", "QCOM", "TXN", "TMUS", "ABNB", "BKNG", "AMD", "SBUX", "INTU", "CHTR", "ISRG", "MDLZ", "GILD", "LRCX", "REGN", "ATVI", "ADI", "AMAT", "MRVL", "ASML", "MRNA", "KLAC", "MU", "MNST", "AVGO", "TEAM", "DXCM", "ILMN", "BIIB", "SNPS", "CDNS", "ALGN", "WDAY", "IDXX", "NXPI", "FTNT", "CTSH", "EA", "VRSK", "PAYX", "ROST", "ODFL", "CPRT", "ADSK", "FAST", "DLTR", "CTAS", "ZM", "PANW", "VRTX", "CRWD", "EBAY", "MCHP", "DDOG", "XEL", "ANSS", "SPLK", "SWKS", "SIRI", "MTCH", "OKTA", "DOCU", "SGEN", "ZS", "ULTA", "CDW", "FANG", "ETSY", "TTWO", "WBA", "LCID", "RIVN", "PCAR", "ORLY", "MAR", "COST", "PDD", "JD", "DASH", "COIN", "LULU", "ROKU", "NET", "TTD", "RBLX", "SOFI", "UPST", "PLTR"
+)
+
 class TestTradingSystem(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -20,7 +25,7 @@ class TestTradingSystem(unittest.TestCase):
         cls.data_dir = cls.project_dir / "src/market_data"
         
         # Ensure data directory exists
-        if not cls.data_dir.exists() or not any(cls.data_dir.glob("*_hourly.csv")):
+        if not cls.data_dir.exists() or not any(cls.data_dir.glob("ticker=*/*.parquet")):
             raise unittest.SkipTest("No market data files found. Please run data collection first.")
         
         # Set reference date with timezone
@@ -34,53 +39,70 @@ class TestTradingSystem(unittest.TestCase):
             results_dir=str(cls.project_dir / "backtest_results"),
             reference_date=cls.reference_date
         )
+        cls._baseline = None
+        
+        # Load the market data sample once rather than on every run of the processing test
+        start_date = cls.reference_date - timedelta(days=14)
+        end_date = cls.reference_date + timedelta(days=7)
+        cls._analysis_window = (start_date, end_date)
+        cls._analysis_data = cls.runner.data_collector.get_data_for_analysis(
+            tickers=_SAMPLE_TICKERS,
+            start_date=start_date.strftime('%Y-%m-%d'),
+            end_date=end_date.strftime('%Y-%m-%d'),
+            resolution="hourly"
+        )
+
+    @classmethod
+    def _baseline_results(cls):
+        """
+        Results of the full historical run, made on first use. It is the slowest
+        step and needs personas and the LLM, so only the trade tests trigger it
+        and they share the read-only results.
+        """
+        if cls._baseline is None:
+            cls._baseline = cls.runner.run_historical_test(
+                lookback_days=14,
+                forward_days=7
+            )
+        return cls._baseline
 
     def test_forward_testing_period(self):
         """Test that trades can span the full forward testing period"""
-        results = self.runner.run_historical_test(
-            lookback_days=14,
-            forward_days=7
-        )
+        results = self._baseline_results()
         
         # Check if trades exist
         self.assertTrue(any(results.values()), "No trading results found")
         
+        max_exit = self.reference_date + timedelta(days=7)
         for persona_results in results.values():
-            if 'trade_log' in persona_results:
-                for trade in persona_results['trade_log']:
-                    # Convert string times to timezone-aware datetimes
-                    entry_time = pd.to_datetime(trade['entry_time']).tz_localize('America/New_York')
-                    exit_time = pd.to_datetime(trade['exit_time']).tz_localize('America/New_York')
-                    
-                    # Trade duration should be more than 1 hour
-                    duration = exit_time - entry_time
-                    self.assertGreater(
-                        duration,
-                        timedelta(hours=1),
-                        "Trade duration too short"
-                    )
-                    
-                    # Ensure entry time is at or after reference date
-                    self.assertGreaterEqual(
-                        entry_time,
-                        self.reference_date,
-                        "Trade entry before reference date"
-                    )
-                    
-                    # Exit time should not exceed forward testing period
-                    max_exit = self.reference_date + timedelta(days=7)
-                    self.assertLessEqual(
-                        exit_time,
-                        max_exit,
-                        "Trade extends beyond forward testing period"
-                    )
+            if persona_results.get('trade_log'):
+                trades = pd.DataFrame(persona_results['trade_log'])
+                
+                # Parse every ISO-8601 time (with UTC offset) as a New York datetime at once
+                entry_times = pd.to_datetime(trades['entry_time'], utc=True).dt.tz_convert(self.ny_tz)
+                exit_times = pd.to_datetime(trades['exit_time'], utc=True).dt.tz_convert(self.ny_tz)
+                
+                # Trade duration should be more than 1 hour
+                self.assertTrue(
+                    (exit_times - entry_times > pd.Timedelta(hours=1)).all(),
+                    "Trade duration too short"
+                )
+                
+                # Ensure entry time is at or after reference date
+                self.assertTrue(
+                    (entry_times >= self.reference_date).all(),
+                    "Trade entry before reference date"
+                )
+                
+                # Exit time should not exceed forward testing period
+                self.assertTrue(
+                    (exit_times <= max_exit).all(),
+                    "Trade extends beyond forward testing period"
+                )
 
     def test_trade_duration(self):
         """Test that trades are not closed immediately"""
-        results = self.runner.run_historical_test(
-            lookback_days=14,
-            forward_days=7
-        )
+        results = self._baseline_results()
         
         for persona_results in results.values():
             if 'trade_log' in persona_results:
@@ -101,18 +123,10 @@ class TestTradingSystem(unittest.TestCase):
 
     def test_market_data_processing(self):
         """Test market data processing across multiple days"""
-        # Test data loading for a sample of tickers
-        sample_tickers = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "PYPL", "INTC", "CSCO", "CMCSA", "ADBE", "QCOM", "TXN", "TMUS", "ABNB", "BKNG", "AMD", "SBUX", "INTU", "CHTR", "ISRG", "MDLZ", "GILD", "LRCX", "REGN", "ATVI", "ADI", "AMAT", "MRVL", "ASML", "MRNA", "KLAC", "MU", "MNST", "AVGO", "TEAM", "DXCM", "ILMN", "BIIB", "SNPS", "CDNS", "ALGN", "WDAY", "IDXX", "NXPI", "FTNT", "CTSH", "EA", "VRSK", "PAYX", "ROST", "ODFL", "CPRT", "ADSK", "FAST", "DLTR", "CTAS", "ZM", "PANW", "VRTX", "CRWD", "EBAY", "MCHP", "DDOG", "XEL", "ANSS", "SPLK", "SWKS", "SIRI", "MTCH", "OKTA", "DOCU", "SGEN", "ZS", "ULTA", "CDW", "FANG", "ETSY", "TTWO", "WBA", "LCID", "RIVN", "PCAR", "ORLY", "MAR", "COST", "PDD", "JD", "DASH", "COIN", "LULU", "ROKU", "NET", "TTD", "RBLX", "SOFI", "UPST", "PLTR"]
-        start_date = self.reference_date - timedelta(days=14)
-        end_date = self.reference_date + timedelta(days=7)
+        start_date, end_date = self._analysis_window
         
         market_data = self.runner._slice_market_data(
-            market_data=self.runner.data_collector.get_data_for_analysis(
-                tickers=sample_tickers,
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d'),
-                resolution="hourly"
-            ),
+            market_data=self._analysis_data,
             start_date=start_date,
             end_date=end_date
         )
@@ -0,0 +1,168 @@
+import unittest
+from unittest import mock
+import json
+import shutil
+import tempfile
+from datetime import datetime
+import httpx
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.market_data_collection_system import MarketDataCollector
+from src.trading_system_runner import TradingSystemRunner, MIN_ROWS
+from tests.helpers import data_request
+
+_AsyncClient = httpx.AsyncClient
+
+def _ollama(request: httpx.Request) -> httpx.Response:
+    """Ollama stand-in: batched data requests, single data requests and trade decisions"""
+    schema = json.loads(request.content)["format"]
+    if schema["type"] == "array":
+        answer = [data_request()] * schema["minItems"]
+    elif "action" in schema["properties"]:
+        answer = {
+            "action": "BUY", "ticker": "AAPL", "amount": 10,
+            "expected_timeframe": "3d", "expected_profit_percentage": 1
+        }
+    else:
+        answer = data_request()
+    line = json.dumps({"response": json.dumps(answer), "done": True})
+    return httpx.Response(200, content=(line + "\n").encode())
+
+class TestHistoricalRun(unittest.TestCase):
+    def setUp(self):
+        """Hourly data for two tickers and two personas in a temporary project"""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+        collector = MarketDataCollector(str(self.root / "market_data"))
+        index = pd.date_range('2025-01-20 09:30', periods=24 * 25, freq='h', tz='America/New_York')
+        rng = np.random.default_rng(0)
+        for ticker in ["AAPL", "MSFT"]:
+            close = 100 + np.cumsum(rng.normal(0, 1, len(index)))
+            collector._write_ticker_data(ticker, pd.DataFrame({
+                'Datetime': index, 'Open': close, 'High': close + 1,
+                'Low': close - 1, 'Close': close, 'Volume': 1000
+            }))
+
+        prompts_dir = self.root / "prompts"
+        prompts_dir.mkdir()
+        for name in ["alpha", "beta"]:
+            (prompts_dir / f"{name}.txt").write_text(f"You are {name}, a trader.")
+
+    def _run(self, reference_date: datetime):
+        runner = TradingSystemRunner(
+            data_dir=str(self.root / "market_data"),
+            prompts_dir=str(self.root / "prompts"),
+            results_dir=str(self.root / "results"),
+            reference_date=reference_date
+        )
+        client = lambda **kwargs: _AsyncClient(transport=httpx.MockTransport(_ollama), **kwargs)
+        with mock.patch.object(httpx, "AsyncClient", client), mock.patch("webbrowser.open"):
+            return runner.run_historical_test(lookback_days=14, forward_days=7)
+
+    def test_naive_reference_date(self):
+        """A naive reference date is read as New York time against the tz-aware data"""
+        results = self._run(datetime(2025, 2, 5))
+
+        self.assertEqual(sorted(results), ["alpha", "beta"])
+        for persona_results in results.values():
+            self.assertTrue(persona_results['trade_log'])
+
+class TestSliceMarketData(unittest.TestCase):
+    def setUp(self):
+        """A runner over a temporary project and hourly frames for two tickers"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.runner = TradingSystemRunner(
+            data_dir=str(Path(root) / "market_data"),
+            prompts_dir=str(Path(root) / "prompts"),
+            results_dir=str(Path(root) / "results"),
+            reference_date=datetime(2025, 2, 5)
+        )
+
+        self.index = pd.date_range('2025-02-03 09:30', periods=48, freq='h', tz='America/New_York')
+        self.market_data = {}
+        for offset, ticker in enumerate(["AAPL", "MSFT"]):
+            close = np.arange(len(self.index), dtype=np.float64) + 100 + offset
+            self.market_data[ticker] = pd.DataFrame({
+                'Datetime': self.index, 'Open': close, 'High': close + 1,
+                'Low': close - 1, 'Close': close, 'Volume': 1000.0
+            })
+
+    def test_naive_bounds(self):
+        """Naive bounds are read as New York time, like a naive reference date"""
+        self.assertEqual(self.runner.reference_date.utcoffset(), pd.Timedelta(hours=-5))
+
+        naive = self.runner._slice_market_data(
+            self.market_data, datetime(2025, 2, 3, 12), datetime(2025, 2, 4, 12)
+        )
+        aware = self.runner._slice_market_data(
+            self.market_data,
+            pd.Timestamp('2025-02-03 12:00', tz='America/New_York'),
+            pd.Timestamp('2025-02-04 12:00', tz='America/New_York')
+        )
+        for ticker in ["AAPL", "MSFT"]:
+            pd.testing.assert_frame_equal(naive[ticker], aware[ticker])
+
+    def test_end_is_exclusive(self):
+        """Bars at start_date are kept and bars at end_date are not"""
+        start, end = self.index[5], self.index[25]
+        sliced = self.runner._slice_market_data(self.market_data, start, end)
+
+        for ticker in ["AAPL", "MSFT"]:
+            self.assertEqual(sliced[ticker].index[0], start)
+            self.assertEqual(sliced[ticker].index[-1], self.index[24])
+            self.assertEqual(len(sliced[ticker]), 20)
+
+        # A bound one nanosecond past a bar takes that bar in
+        sliced = self.runner._slice_market_data(self.market_data, start, end + pd.Timedelta(1, 'ns'))
+        self.assertEqual(sliced["AAPL"].index[-1], end)
+
+    def test_short_tickers_dropped(self):
+        """Tickers with fewer than MIN_ROWS bars in the window are logged and left out"""
+        self.market_data["NVDA"] = self.market_data["AAPL"].iloc[:MIN_ROWS - 1]
+        self.market_data["AMD"] = self.market_data["AAPL"].iloc[:MIN_ROWS]
+
+        with self.assertLogs(self.runner.logger, level='WARNING') as logs:
+            sliced = self.runner._slice_market_data(self.market_data, self.index[0], self.index[-1])
+
+        self.assertEqual(sorted(sliced), ["AAPL", "AMD", "MSFT"])
+        self.assertEqual(len(sliced["AMD"]), MIN_ROWS)
+        self.assertEqual(logs.output, [f"WARNING:{self.runner.logger.name}:Insufficient data points for NVDA"])
+
+    def test_tickers_missing_from_panel(self):
+        """Empty frames and tickers outside the window don't appear in the result"""
+        self.market_data["NVDA"] = pd.DataFrame()
+        self.market_data["AMD"] = self.market_data["AAPL"].assign(
+            Datetime=self.index - pd.Timedelta(days=30)
+        )
+
+        with self.assertLogs(self.runner.logger, level='WARNING'):
+            sliced = self.runner._slice_market_data(self.market_data, self.index[0], self.index[-1])
+        self.assertEqual(sorted(sliced), ["AAPL", "MSFT"])
+
+        with self.assertRaisesRegex(ValueError, "No valid data after filtering"):
+            self.runner._slice_market_data({"NVDA": pd.DataFrame()}, self.index[0], self.index[-1])
+
+    def test_matches_per_ticker_slicing(self):
+        """The shared panel gives the same bars as masking each ticker's frame on its own"""
+        # Misaligned timestamps, so the panel has rows where only one ticker traded
+        self.market_data["MSFT"] = self.market_data["MSFT"].iloc[::3]
+        start, end = self.index[4], self.index[40]
+        sliced = self.runner._slice_market_data(self.market_data, start, end)
+
+        for ticker, df in self.market_data.items():
+            mask = (df['Datetime'] >= start) & (df['Datetime'] < end)
+            expected = df[mask].set_index('Datetime')[['Open', 'High', 'Low', 'Close', 'Volume']]
+            expected.index.name = None
+            pd.testing.assert_frame_equal(sliced[ticker], expected, check_dtype=False, check_freq=False)
+
+if __name__ == '__main__':
+    unittest.main()